@@ -1,19 +1,37 @@
+import logging
+import os
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from time import sleep
-from dataclasses import dataclass
-
-# Define a Product class using dataclass
-@dataclass
-class Product:
-    title: str
-    price_currency: str
-    price_whole: float
-    link: str
-
-    def __str__(self):
-        return f"{self.title} - {self.price_currency}{self.price_whole} - {self.link}"
+from product import Product
+from registry import SiteInfo, register
+from readiness import ReadinessSpec, wait_until_ready
+from extraction import EXTRACTION_MODE, FieldSpec, extract_rows, extract_rows_from_html
+from http_fetch import fetch_page
+from metrics import PHASE_SECONDS, field_timer
+from snapshots import capture_html, capture_page
+
+logger = logging.getLogger(__name__)
+
+# Overridable so benchmarks can point the scraper at a local fixture server
+BASE_URL = os.environ.get("AMAZON_BASE_URL", "https://www.amazon.in")
+CONTAINER_SELECTOR = "div.s-result-item"
+
+# Results render server side, but sponsored rows keep arriving for a moment
+READINESS = ReadinessSpec(site="amazon", container_selector=CONTAINER_SELECTOR, timeout=10, stable_polls=2)
+
+# Field selectors for the single round trip extraction path
+FIELDS = {
+    "title": FieldSpec("h2.a-size-medium.a-text-normal span"),
+    "price_whole": FieldSpec("span.a-price-whole"),
+    "price_currency": FieldSpec("span.a-price-symbol"),
+    "link": FieldSpec("a.a-link-normal.a-text-normal", attr="href"),
+}
+
+def search_url(product_name: str) -> str:
+    """Build the Amazon search results URL for product_name."""
+    query = product_name.replace(" ", "+")
+    return f"{BASE_URL}/s?k={query}"
 
 def scrape_amazon_products(product_name: str, browser: webdriver) -> list[Product]:
     """
@@ -21,41 +39,112 @@ def scrape_amazon_products(product_name: str, browser: webdriver) -> list[Produc
     
     Args:
         product_name (str): The product to search for (e.g., "iphone 16 pro max").
-        chromedriver_path (str): Path to the chromedriver executable.
+        browser (webdriver): Selenium WebDriver instance (configured externally).
     
     Returns:
         list[Product]: A list of Product objects sorted by price_whole in ascending order.
     """
+        # Navigate to Amazon search page
+    with PHASE_SECONDS.time(site="amazon", phase="navigate"):
+        browser.get(search_url(product_name))
+    wait_until_ready(browser, READINESS)
+    capture_page(browser, "amazon", product_name)
 
+    products = extract_products(browser)
 
+        # Sort products by price_whole in ascending order
+    products.sort(key=lambda x: x.price_whole)
 
-        # Navigate to Amazon search page
-    query = product_name.replace(" ", "+")
-    browser.get(f"https://www.amazon.in/s?k={query}")
-    sleep(5)
+    return products
+
+def fetch_amazon_products(product_name: str) -> tuple[list[Product], bool]:
+    """
+    Fetch Amazon search results over plain HTTP, without a browser.
+
+    Args:
+        product_name (str): The product to search for (e.g., "iphone 16 pro max").
+
+    Returns:
+        tuple[list[Product], bool]: Products sorted by price, and whether the site served a block page.
+    """
+    page = fetch_page(search_url(product_name))
+    if page.blocked:
+        return [], True
+    capture_html("amazon", product_name, page.url, page.html)
+    products = parse_html(page.html, page.url)
+    products.sort(key=lambda p: p.price_whole)
+    return products, False
+
+def parse_html(html: str, base_url: str = BASE_URL) -> list[Product]:
+    """
+    Extract products from the HTML of an Amazon results page, fetched or from a snapshot.
 
+    Returns:
+        list[Product]: The valid products in page order.
+    """
+    return _parse_rows(extract_rows_from_html(html, CONTAINER_SELECTOR, FIELDS, base_url=base_url, site="amazon"))
+
+def extract_products(browser: webdriver, mode: str = None) -> list[Product]:
+    """
+    Extract products from the results page currently loaded in browser.
+
+    Args:
+        browser (webdriver): Selenium WebDriver instance on an Amazon results page.
+        mode (str, optional): "bulk" or "elements". Defaults to EXTRACTION_MODE.
+
+    Returns:
+        list[Product]: The valid products in page order.
+    """
+    if (mode or EXTRACTION_MODE) == "elements":
+        return _extract_with_elements(browser)
+    return _extract_with_script(browser)
+
+def _extract_with_script(browser: webdriver) -> list[Product]:
+    return _parse_rows(extract_rows(browser, CONTAINER_SELECTOR, FIELDS, site="amazon"))
+
+def _parse_rows(rows: list[dict]) -> list[Product]:
+    products = []
+    for row in rows:
+        try:
+            title = (row["title"] or "").strip()
+            price_whole = float((row["price_whole"] or "0").replace(",", "").strip() or 0)
+            price_currency = (row["price_currency"] or "").strip() or "₹"
+            link = row["link"] or ""
+        except ValueError as e:
+            logger.debug("Error parsing product row: %s", e)
+            continue
+        if title and price_whole > 0:  # Only add valid products
+            products.append(Product(title=title, price_currency=price_currency, price_whole=price_whole, link=link, site="amazon"))
+    return products
+
+def _extract_with_elements(browser: webdriver) -> list[Product]:
         # Initialize list to store products
     products = []
 
         # Find all product containers
-    product_containers = browser.find_elements(by=By.CSS_SELECTOR, value="div.s-result-item")
+    with PHASE_SECONDS.time(site="amazon", phase="discover"):
+        product_containers = browser.find_elements(by=By.CSS_SELECTOR, value=CONTAINER_SELECTOR)
 
     for container in product_containers:
         try:
                 # Extract title
-            title_element = container.find_element(by=By.CSS_SELECTOR, value="h2.a-size-medium.a-text-normal span")
-            title = title_element.text.strip() if title_element else ""
+            with field_timer("amazon", "title", "h2.a-size-medium.a-text-normal span"):
+                title_element = container.find_element(by=By.CSS_SELECTOR, value="h2.a-size-medium.a-text-normal span")
+                title = title_element.text.strip() if title_element else ""
 
                 # Extract price
-            price_whole_element = container.find_element(by=By.CSS_SELECTOR, value="span.a-price-whole")
-            price_whole = float(price_whole_element.text.replace(",", "").strip()) if price_whole_element else 0.0
+            with field_timer("amazon", "price_whole", "span.a-price-whole"):
+                price_whole_element = container.find_element(by=By.CSS_SELECTOR, value="span.a-price-whole")
+                price_whole = float(price_whole_element.text.replace(",", "").strip()) if price_whole_element else 0.0
 
-            price_currency_element = container.find_element(by=By.CSS_SELECTOR, value="span.a-price-symbol")
-            price_currency = price_currency_element.text.strip() if price_currency_element else "₹"
+            with field_timer("amazon", "price_currency", "span.a-price-symbol"):
+                price_currency_element = container.find_element(by=By.CSS_SELECTOR, value="span.a-price-symbol")
+                price_currency = price_currency_element.text.strip() if price_currency_element else "₹"
 
                 # Extract link
-            link_element = container.find_element(by=By.CSS_SELECTOR, value="a.a-link-normal.a-text-normal")
-            link = link_element.get_attribute("href") if link_element else ""
+            with field_timer("amazon", "link", "a.a-link-normal.a-text-normal"):
+                link_element = container.find_element(by=By.CSS_SELECTOR, value="a.a-link-normal.a-text-normal")
+                link = link_element.get_attribute("href") if link_element else ""
 
                 # Create Product instance and add to list
             if title and price_whole > 0:  # Only add valid products
@@ -63,15 +152,24 @@ def scrape_amazon_products(product_name: str, browser: webdriver) -> list[Produc
                     title=title,
                     price_currency=price_currency,
                     price_whole=price_whole,
-                    link=link
+                    link=link,
+                    site="amazon"
                 )
                 products.append(product)
 
         except Exception as e:
-                print(f"Error parsing product container: {e}")
+                logger.debug("Error parsing product container: %s", e)
                 continue
 
-        # Sort products by price_whole in ascending order
-    products.sort(key=lambda x: x.price_whole)
-
-    return products
\ No newline at end of file
+    return products
+
+# amazon.in only ships within India
+register(SiteInfo(
+    name="amazon",
+    scrape=scrape_amazon_products,
+    fetch=fetch_amazon_products,
+    regions=("in",),
+    currency="₹",
+    expected_cost=4.0,
+    block_urls=("*fls-eu.amazon.*", "*fls-na.amazon.*", "*/uedata*"),  # Client-side metrics beacons
+))
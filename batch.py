@@ -0,0 +1,214 @@
+import concurrent.futures
+import itertools
+import json
+import logging
+import multiprocessing
+import multiprocessing.util
+import os
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+# Outcomes a resumed run tries again
+RETRY_STATUSES = ("error", "circuit_open")
+
+# Set in each worker process by _init_worker
+_scrape = None
+
+
+# --- Input and checkpoint ---
+def read_queries(path):
+    """
+    Yield (id, query dict or None, error) for each non-blank line of a JSONL file. Each line is
+    {"product_name": ..., "location"?: ..., "sites"?: [...] or "a,b", "exclude_sites"?: ..., "id"?: ...}.
+
+    The id is the line's "id" field, or its 1-based line number, so it stays stable across resumes.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                query = json.loads(line)
+            except ValueError as e:
+                yield line_no, None, f"invalid JSON: {e}"
+                continue
+            if not isinstance(query, dict) or not query.get("product_name"):
+                yield line_no, None, "'product_name' is required"
+                continue
+            yield query.get("id", line_no), query, None
+
+
+def read_checkpoint(path):
+    """
+    Return the (id, site) pairs already in the output file. A line cut off by a crash is ignored, and
+    errored or skipped scrapes are not counted as done, so a resumed run retries them.
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                if record["status"] not in RETRY_STATUSES:
+                    done.add((record["id"], record["site"]))
+            except (ValueError, KeyError, TypeError):
+                continue
+    return done
+
+
+def _open_output(path):
+    output = open(path, "a+", encoding="utf-8")
+    output.seek(0, os.SEEK_END)
+    if output.tell():
+        # Finish a line left half written by a crash so the next record starts on its own line
+        output.seek(output.tell() - 1)
+        if output.read(1) != "\n":
+            output.write("\n")
+    return output
+
+
+def _site_list(value):
+    if isinstance(value, str):
+        value = value.split(",")
+    return [site.strip().lower() for site in value or [] if site.strip()]
+
+
+def plan_jobs(queries, done, chunk_size):
+    """
+    Group the outstanding (query, site) jobs by site and cut them into chunks.
+
+    Chunks of different sites are interleaved, so the workers spread over the sites instead of
+    all hitting the first one.
+
+    Returns:
+        tuple[list[tuple[str, list]], list[dict]]: (site, [(id, query)...]) chunks, and records for invalid queries.
+    """
+    from registry import select_sites
+
+    by_site = {}
+    invalid = []
+    for query_id, query, error in queries:
+        if error is None:
+            try:
+                sites = select_sites(query.get("location"), include=_site_list(query.get("sites")),
+                                     exclude=_site_list(query.get("exclude_sites")))
+            except ValueError as e:
+                error = str(e)
+        if error is not None:
+            if (query_id, "") not in done:
+                invalid.append({"id": query_id, "site": "", "status": "invalid", "error": error})
+            continue
+        for site_info in sites:
+            if (query_id, site_info.name) not in done:
+                by_site.setdefault(site_info.name, []).append((query_id, query))
+
+    per_site = [
+        [(site, jobs[i:i + chunk_size]) for i in range(0, len(jobs), chunk_size)]
+        for site, jobs in by_site.items()
+    ]
+    chunks = [chunk for group in itertools.zip_longest(*per_site) for chunk in group if chunk is not None]
+    return chunks, invalid
+
+
+# --- Workers ---
+def _init_worker():
+    global _scrape
+    # Under the spawn start method the child has already re-imported the launching script as
+    # __mp_main__; reuse it rather than building a second app, pool and scheduler
+    main = sys.modules.get("__mp_main__")
+    if main is not None and hasattr(main, "run_scraper"):
+        _scrape = main
+    else:
+        import scrape
+        _scrape = scrape
+    # Close this worker's browsers, and flush its price history, when the pool shuts it down
+    multiprocessing.util.Finalize(None, _scrape.browser_pool.close, exitpriority=10)
+    if _scrape.price_history is not None:
+        multiprocessing.util.Finalize(None, _scrape.price_history.close, exitpriority=10)
+
+
+def _run_chunk(site, jobs):
+    """Scrape one site for each query of a chunk with this worker's browser. Returns the output records."""
+    from circuit_breaker import CircuitOpen
+    from registry import SITES
+
+    site_info = SITES[site]
+    records = []
+    for query_id, query in jobs:
+        started = time.monotonic()
+        try:
+            products = _scrape.run_scraper(site_info, query["product_name"])
+            status = "ok" if products else "empty"
+        except CircuitOpen:
+            products, status = [], "circuit_open"
+        except Exception as e:
+            logger.error("Batch scrape of %s for %r failed: %s", site, query["product_name"], e)
+            products, status = [], "error"
+        _scrape.fx_table.normalize(products)
+        records.append({
+            "id": query_id,
+            "product_name": query["product_name"],
+            "location": query.get("location"),
+            "site": site,
+            "status": status,
+            "elapsed_ms": round((time.monotonic() - started) * 1000),
+            "products": [product.to_dict() for product in products],
+        })
+    return records
+
+
+# --- Driver ---
+def run_batch(input_path, output_path, workers=2, chunk_size=10):
+    """
+    Run every query in input_path and append the results to output_path, skipping work already there.
+
+    Queries are split into one job per (query, site), grouped by site into chunks, and the chunks
+    are spread over worker processes that each keep their own warm browser. Every finished chunk is
+    appended to the output straight away, so the output doubles as the checkpoint: running the same
+    command again after a crash only does the work that is missing.
+
+    Args:
+        input_path (str): JSONL file of queries.
+        output_path (str): JSONL file of {"id", "product_name", "location", "site", "status", "elapsed_ms",
+            "products"} records, one per (query, site). Also the checkpoint.
+        workers (int): Worker processes, each holding its own browser.
+        chunk_size (int): Queries per site handed to a worker at once.
+
+    Returns:
+        dict: Counts of chunks, records written and records skipped as already done.
+    """
+    done = read_checkpoint(output_path)
+    chunks, invalid = plan_jobs(read_queries(input_path), done, chunk_size)
+    logger.info("Batch: %d chunk(s) to run, %d (query, site) result(s) already in %s", len(chunks), len(done), output_path)
+
+    written = 0
+    with _open_output(output_path) as output:
+        def write(records):
+            nonlocal written
+            for record in records:
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+            written += len(records)
+
+        write(invalid)
+        if chunks:
+            # spawn rather than fork: the parent has live scheduler threads, and Chrome does not survive fork on macOS
+            context = multiprocessing.get_context("spawn")
+            # A worker runs one chunk at a time, so its pool holds one browser. Children build the pool
+            # when they import scrape, before any initializer runs, so this has to be in their environment.
+            pool_size = os.environ.get("BROWSER_POOL_SIZE")
+            os.environ["BROWSER_POOL_SIZE"] = "1"
+            try:
+                with concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as executor:
+                    futures = [executor.submit(_run_chunk, site, jobs) for site, jobs in chunks]
+                    for future in concurrent.futures.as_completed(futures):
+                        write(future.result())
+            finally:
+                if pool_size is None:
+                    os.environ.pop("BROWSER_POOL_SIZE", None)
+                else:
+                    os.environ["BROWSER_POOL_SIZE"] = pool_size
+    return {"chunks": len(chunks), "written": written, "skipped": len(done)}
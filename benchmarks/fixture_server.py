@@ -0,0 +1,175 @@
+"""
+Local stand-in for the shopping sites, serving recorded search result pages.
+
+Every path under /<site>/ returns benchmarks/fixtures/<site>.html whatever the query, so a scraper
+whose <SITE>_BASE_URL points at http://127.0.0.1:<port>/<site> scrapes the snapshot instead of the
+live site. Snapshots are recorded with benchmarks.record. Sites without a snapshot get a synthetic
+page built with the same markup the scraper's selectors expect, so the harness also runs on a
+fresh checkout.
+
+Run standalone with: python -m benchmarks.fixture_server --port 8765
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+SITES = ("amazon", "flipkart", "target", "myntra", "nykaa")
+
+# Environment variable each site module reads its base URL from
+BASE_URL_ENV = {
+    "amazon": "AMAZON_BASE_URL",
+    "flipkart": "FLIPKART_BASE_URL",
+    "target": "TARGET_BASE_URL",
+    "myntra": "MYNTRA_BASE_URL",
+    "nykaa": "NYKAA_BASE_URL",
+}
+
+
+# --- Synthetic pages ---
+def _item(i):
+    return f"Benchmark Product {i} Matte Finish", 199 + (i * 37) % 4800
+
+def _synthetic_amazon(count):
+    rows = []
+    for i in range(count):
+        title, price = _item(i)
+        rows.append(
+            f'<div class="s-result-item"><h2 class="a-size-medium a-text-normal"><span>{title}</span></h2>'
+            f'<a class="a-link-normal a-text-normal" href="/dp/B{i:06d}">{title}</a>'
+            f'<span class="a-price"><span class="a-price-symbol">₹</span>'
+            f'<span class="a-price-whole">{price:,}<span class="a-price-decimal">.</span></span></span></div>'
+        )
+    return "".join(rows)
+
+def _synthetic_flipkart(count):
+    rows = []
+    for i in range(count):
+        title, price = _item(i)
+        rows.append(
+            f'<div class="yKfJKb row"><a href="/p/itm{i:06d}"><div class="KzDlHZ">{title}</div></a>'
+            f'<div class="Nx9bqj _4b5DiR">₹{price:,}</div></div>'
+        )
+    return "".join(rows)
+
+def _synthetic_target(count):
+    rows = []
+    for i in range(count):
+        title, price = _item(i)
+        rows.append(
+            f'<div class="sc-3f9295af-7 bnHeCs"><a data-test="product-title" href="/p/A-{i:08d}">{title}</a>'
+            f'<span data-test="current-price">${price / 80:.2f}</span></div>'
+        )
+    return "".join(rows)
+
+def _synthetic_myntra(count):
+    rows, state = [], []
+    for i in range(count):
+        title, price = _item(i)
+        rows.append(
+            f'<li class="product-base"><a href="benchmark/{i}/buy"><h3 class="product-brand">Brand{i % 7}</h3>'
+            f'<h4 class="product-product">{title}</h4><div class="product-price">'
+            f'<span class="product-discountedPrice">Rs. {price}</span></div></a></li>'
+        )
+        state.append({"brand": f"Brand{i % 7}", "additionalInfo": title, "price": price, "landingPageUrl": f"benchmark/{i}/buy"})
+    embedded = json.dumps({"searchData": {"results": {"products": state}}})
+    return f'<ul>{"".join(rows)}</ul><script>window.__myx = {embedded}</script>'
+
+def _synthetic_nykaa(count):
+    rows = []
+    for i in range(count):
+        title, price = _item(i)
+        rows.append(
+            f'<div class="css-ifdzs8"><a class="css-qlopj4" href="/p/{i}"><div class="css-xrzmfa">{title}</div>'
+            f'<span class="css-111z9ua">₹{price}</span></a></div>'
+        )
+    return "".join(rows)
+
+SYNTHETIC = {
+    "amazon": _synthetic_amazon,
+    "flipkart": _synthetic_flipkart,
+    "target": _synthetic_target,
+    "myntra": _synthetic_myntra,
+    "nykaa": _synthetic_nykaa,
+}
+
+
+def load_page(site, count=60):
+    """Return the recorded snapshot for a site, or a synthetic page with count products."""
+    path = os.path.join(FIXTURE_DIR, f"{site}.html")
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    return f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{site}</title></head><body>{SYNTHETIC[site](count)}</body></html>"
+
+
+# --- Server ---
+class FixtureServer:
+    """
+    Serves fixture pages on 127.0.0.1 from a background thread.
+
+    Args:
+        port (int): Port to listen on; 0 picks a free one.
+        latency_ms (int): Artificial delay before each response, to mimic a remote site.
+        count (int): Products per synthetic page.
+    """
+
+    def __init__(self, port=0, latency_ms=0, count=60):
+        pages = {site: load_page(site, count).encode("utf-8") for site in SITES}
+        delay = latency_ms / 1000
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                site = self.path.lstrip("/").split("/", 1)[0].split("?", 1)[0]
+                body = pages.get(site)
+                if delay:
+                    time.sleep(delay)
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep benchmark output readable
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def base_url(self, site):
+        # Myntra joins the query straight onto its base URL, so it needs the trailing slash
+        return f"http://127.0.0.1:{self.port}/{site}" + ("/" if site == "myntra" else "")
+
+    def point_scrapers_here(self):
+        """Set every <SITE>_BASE_URL env var. Must run before the site modules are imported."""
+        for site, name in BASE_URL_ENV.items():
+            os.environ[name] = self.base_url(site)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded site snapshots locally.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    args = parser.parse_args()
+    server = FixtureServer(port=args.port, latency_ms=args.latency_ms).start()
+    for site, name in BASE_URL_ENV.items():
+        print(f"export {name}={server.base_url(site)}")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,138 @@
+"""
+Duplicate grouping benchmark.
+
+Builds a synthetic merged result set in which each catalog item is listed on one to four sites
+under a reworded title (reordered words, dropped words, site suffixes, "7ml" vs "7 ml"), next to
+look-alikes that differ only in shade or size. Groups it with grouping.group_products and, up to
+--naive-limit products, by comparing each product with every group so far using the same test.
+Reports time and pairwise precision and recall against the known items.
+
+Run from the repository root with: python -m benchmarks.grouping [--counts 1000,10000,50000] [--output results.json]
+"""
+import argparse
+import json
+import random
+import time
+from itertools import combinations
+
+from grouping import group_products, similarity, title_key
+from product import Product
+
+SITES = ("amazon", "flipkart", "myntra", "nykaa")
+BRANDS = ("Maybelline", "Lakme", "Nykaa", "MAC", "Revlon", "Sugar", "Loreal", "Colorbar", "Swiss Beauty", "Faces",
+          "Huda Beauty", "Insight", "Kay Beauty", "Renee", "Plum", "Biotique", "Lotus", "Elle18", "Blue Heaven", "Myglamm")
+LINES = ("Sensational", "Absolute", "Matte Me", "Retro", "Super Stay", "Color Sensational", "Velvet", "Ultimate",
+         "Smudge Me Not", "Lip Love")
+KINDS = ("Liquid Lipstick", "Lipstick", "Lip Crayon", "Lip Gloss", "Lip Liner", "Lip Tint")
+SHADES = ("Nude Nuance", "Ruby Red", "Coral Crush", "Berry Bliss", "Mauve Magic", "Pink Pop", "Brick Brown",
+          "Plum Perfect", "Rose Gold", "Cherry Kiss", "Toffee Tease", "Wine Wonder")
+SIZES = ("3.5", "4.2", "5", "7", "9")
+SUFFIXES = ("", "", " | Long Lasting", " (Pack of 1)", " - Matte Finish", " for Women")
+
+
+def _item(rng, i):
+    return {
+        "brand": rng.choice(BRANDS), "line": rng.choice(LINES), "kind": rng.choice(KINDS),
+        "shade": rng.choice(SHADES), "number": str(rng.randrange(1, 400)), "size": rng.choice(SIZES),
+        "price": float(rng.randrange(149, 2500)), "id": i,
+    }
+
+
+def _title(rng, item):
+    words = [item["brand"], item["line"], item["kind"], f"{item['shade']} {item['number']}"]
+    if rng.random() < 0.3:
+        words.pop(1)  # Some sites leave the product line out
+    if rng.random() < 0.4:
+        words[-2:] = words[-1:-3:-1]  # ...or put the shade first
+    size = f"{item['size']}ml" if rng.random() < 0.5 else f"{item['size']} ml"
+    if rng.random() < 0.8:
+        words.append(size)
+    return ", ".join(words) + rng.choice(SUFFIXES)
+
+
+def synthetic_results(count, seed=7):
+    """Return (products sorted by price, catalog item id per product)."""
+    rng = random.Random(seed)
+    rows = []
+    i = 0
+    while len(rows) < count:
+        item = _item(rng, i)
+        i += 1
+        for site in rng.sample(SITES, rng.randint(1, len(SITES))):
+            price = round(item["price"] * rng.uniform(0.85, 1.15))
+            product = Product(_title(rng, item), "₹", float(price), f"https://{site}.example/p/{item['id']}", site=site)
+            product.price_normalized = price / 84.0
+            rows.append((product, item["id"]))
+    rows = rows[:count]
+    rows.sort(key=lambda row: row[0].price_normalized)
+    return [product for product, _ in rows], [item_id for _, item_id in rows]
+
+
+def naive_groups(products, threshold=0.5):
+    """The baseline without an index: compare every product with every group found so far."""
+    keys, labels = [], []
+    for product in products:
+        key = title_key(product.title)
+        scores = [similarity(leader, key) for leader in keys]
+        best = max(range(len(scores)), key=scores.__getitem__, default=None)
+        if best is not None and scores[best] >= threshold:
+            labels.append(best)
+        else:
+            labels.append(len(keys))
+            keys.append(key)
+    return labels
+
+
+def _pairs(labels):
+    by_label = {}
+    for i, label in enumerate(labels):
+        by_label.setdefault(label, []).append(i)
+    return {pair for members in by_label.values() for pair in combinations(members, 2)}
+
+
+def _quality(labels, truth):
+    found, expected = _pairs(labels), _pairs(truth)
+    hits = len(found & expected)
+    return {
+        "precision": round(hits / len(found), 4) if found else 1.0,
+        "recall": round(hits / len(expected), 4) if expected else 1.0,
+    }
+
+
+def bench(count, naive_limit):
+    products, truth = synthetic_results(count)
+    started = time.perf_counter()
+    groups = group_products(products)
+    elapsed = time.perf_counter() - started
+
+    index = {id(product): n for n, group in enumerate(groups) for product in group.offers}
+    report = {
+        "count": count,
+        "items": len(set(truth)),
+        "minhash_lsh": {"seconds": round(elapsed, 4), "groups": len(groups),
+                        **_quality([index[id(product)] for product in products], truth)},
+    }
+    if count <= naive_limit:
+        started = time.perf_counter()
+        labels = naive_groups(products)
+        report["naive"] = {"seconds": round(time.perf_counter() - started, 4), "groups": len(set(labels)),
+                                     **_quality(labels, truth)}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cross-site duplicate grouping.")
+    parser.add_argument("--counts", default="1000,5000,20000", help="Comma separated result set sizes")
+    parser.add_argument("--naive-limit", type=int, default=5000, help="Largest size to also group without the index")
+    parser.add_argument("--output", help="Also write the report as JSON to this file")
+    args = parser.parse_args()
+
+    report = [bench(int(count), args.naive_limit) for count in args.counts.split(",")]
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Product model benchmark.
+
+Compares the shared slotted Product and encode_products against the per-module dataclass and
+dataclasses.asdict + json.dumps path it replaced, on a synthetic result set. Reports bytes
+allocated per product and the time to serialize the whole set.
+
+Run from the repository root with: python -m benchmarks.products [--count 10000] [--output results.json]
+"""
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+
+from product import Product, encode_products
+
+
+@dataclass
+class LegacyProduct:
+    """The dataclass each site module used to define."""
+    title: str
+    price_currency: str
+    price_whole: float
+    link: str
+
+
+def _rows(count):
+    # Distinct strings per row, as a real scrape would produce
+    return [
+        (f"Benchmark Product {i} Matte Finish", "₹", float(199 + (i * 37) % 4800), f"https://example.com/p/{i}")
+        for i in range(count)
+    ]
+
+
+def _bytes_per_product(build, rows):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    products = build(rows)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Exclude the row tuples and strings, which both models share
+    return round((after - before) / len(rows), 1), products
+
+
+def _time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return round(statistics.median(samples), 5)
+
+
+def bench(count, repeat):
+    rows = _rows(count)
+    legacy_bytes, legacy = _bytes_per_product(lambda rows: [LegacyProduct(*row) for row in rows], rows)
+    slotted_bytes, slotted = _bytes_per_product(lambda rows: [Product(*row, site="amazon") for row in rows], rows)
+    return {
+        "count": count,
+        "legacy_dataclass": {
+            "bytes_per_product": legacy_bytes,
+            "serialize_s": _time(lambda: json.dumps([asdict(p) for p in legacy], ensure_ascii=False).encode(), repeat),
+        },
+        "slotted_product": {
+            "bytes_per_product": slotted_bytes,
+            "serialize_s": _time(lambda: encode_products(slotted), repeat),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Product memory use and JSON serialization.")
+    parser.add_argument("--count", type=int, default=10000, help="Products in the synthetic result set")
+    parser.add_argument("--repeat", type=int, default=5, help="Serialization runs; the median is reported")
+    parser.add_argument("--output", help="Also write the report as JSON to this file")
+    args = parser.parse_args()
+
+    report = bench(args.count, args.repeat)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Record live search result pages into benchmarks/fixtures/<site>.html for the offline benchmarks.
+
+Run from the repository root with: python -m benchmarks.record --query lipstick [--sites amazon,nykaa]
+"""
+import argparse
+import importlib
+import os
+
+from benchmarks.fixture_server import FIXTURE_DIR, SITES
+
+
+def record(query, sites):
+    # Imported here so the live base URLs are used, not a fixture server override
+    from scrape import initialize_browser
+    from readiness import wait_until_ready
+
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    browser = initialize_browser()
+    try:
+        for site in sites:
+            module = importlib.import_module(site)
+            browser.get(module.search_url(query))
+            ready = wait_until_ready(browser, module.READINESS)
+            path = os.path.join(FIXTURE_DIR, f"{site}.html")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(browser.page_source)
+            print(f"{site}: saved {path} ({ready.count} containers, ready={ready.ready} in {ready.elapsed:.2f}s)")
+    finally:
+        browser.quit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record live search pages as benchmark fixtures.")
+    parser.add_argument("--query", default="lipstick")
+    parser.add_argument("--sites", default=",".join(SITES), help="Comma separated site names")
+    args = parser.parse_args()
+    record(args.query, [site.strip() for site in args.sites.split(",") if site.strip()])
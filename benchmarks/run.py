@@ -0,0 +1,196 @@
+"""
+Offline scraper benchmark.
+
+Serves the fixture pages from a local server, points every site's base URL at it, and reports:
+  - per site: time-to-ready, and extraction time and WebDriver round trips for each extraction mode
+  - per site: bytes transferred, requests and page load time with a full profile and with the lean one
+  - end to end: /search latency at several concurrency levels, and the memory of the browsers afterwards
+
+Run from the repository root with: python -m benchmarks.run [--concurrency 1,4,8] [--output results.json]
+Save the JSON output of two runs to compare a change against its baseline, e.g. --execution browsers
+against --execution tabs (with SCRAPER_HTTP_FIRST=0 so every site actually uses Chrome).
+"""
+import argparse
+import concurrent.futures
+import importlib
+import json
+import os
+import statistics
+import time
+
+from benchmarks.fixture_server import FixtureServer
+
+
+def count_round_trips(driver):
+    """
+    Count every WebDriver command sent through driver, including those issued by its WebElements.
+
+    Returns:
+        dict: {"count": n}, updated in place as commands are sent.
+    """
+    counter = {"count": 0}
+    execute = driver.execute
+
+    def counting_execute(driver_command, params=None):
+        counter["count"] += 1
+        return execute(driver_command, params)
+
+    driver.execute = counting_execute
+    return counter
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+# --- Per-site phase timings ---
+def bench_sites(sites, repeat):
+    from scrape import initialize_browser
+    from readiness import wait_until_ready
+
+    report = {}
+    browser = initialize_browser()
+    counter = count_round_trips(browser)
+    try:
+        for site in sites:
+            module = importlib.import_module(site)
+            ready_times = []
+            modes = {"elements": {"seconds": [], "round_trips": [], "products": 0},
+                     "bulk": {"seconds": [], "round_trips": [], "products": 0}}
+            for _ in range(repeat):
+                browser.get(module.search_url("benchmark"))
+                ready_times.append(wait_until_ready(browser, module.READINESS).elapsed)
+                for mode, stats in modes.items():
+                    counter["count"] = 0
+                    started = time.perf_counter()
+                    products = module.extract_products(browser, mode)
+                    stats["seconds"].append(time.perf_counter() - started)
+                    stats["round_trips"].append(counter["count"])
+                    stats["products"] = len(products)
+            report[site] = {
+                "time_to_ready_p50_s": round(statistics.median(ready_times), 4),
+                **{
+                    f"{mode}_{key}": value
+                    for mode, stats in modes.items()
+                    for key, value in (
+                        ("extract_p50_s", round(statistics.median(stats["seconds"]), 4)),
+                        ("round_trips", max(stats["round_trips"])),
+                        ("products", stats["products"]),
+                    )
+                },
+            }
+    finally:
+        browser.quit()
+    return report
+
+
+# --- Lean profile and URL blocking ---
+def bench_blocking(sites, repeat):
+    from scrape import initialize_browser
+    from readiness import wait_until_ready
+    from registry import SITES
+    from browser_profile import blocked_urls, page_weight
+
+    report = {site: {} for site in sites}
+    for profile, images in (("full", True), ("lean", False)):
+        browser = initialize_browser(images=images)
+        try:
+            browser.execute_cdp_cmd("Network.enable", {})
+            # The browser cache would hide the bytes of every load after the first
+            browser.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": True})
+            for site in sites:
+                module = importlib.import_module(site)
+                urls = blocked_urls(SITES[site]) if profile == "lean" else []
+                browser.execute_cdp_cmd("Network.setBlockedURLs", {"urls": urls})
+                samples = []
+                for _ in range(repeat):
+                    browser.get(module.search_url("benchmark"))
+                    wait_until_ready(browser, module.READINESS)
+                    samples.append(page_weight(browser))
+                report[site][profile] = {
+                    "bytes_p50": statistics.median(s["bytes"] for s in samples),
+                    "requests_p50": statistics.median(s["requests"] for s in samples),
+                    "load_ms_p50": statistics.median(s["load_ms"] or 0 for s in samples),
+                }
+        finally:
+            browser.quit()
+    return report
+
+
+# --- End to end /search latency ---
+def bench_search(levels, requests_per_level, sites):
+    import scrape
+
+    client = scrape.app.test_client()
+    report = {}
+    run = 0
+    for level in levels:
+        run += 1
+
+        def one_request(i):
+            # A distinct query per request so neither the cache nor coalescing hides the scrape
+            started = time.perf_counter()
+            response = client.get("/search", query_string={
+                "product_name": f"benchmark {run} {i}",
+                "sites": ",".join(sites),
+            })
+            return time.perf_counter() - started, response.status_code
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=level) as executor:
+            results = list(executor.map(one_request, range(requests_per_level)))
+        latencies = [elapsed for elapsed, status in results if status == 200]
+        report[str(level)] = {
+            "requests": len(results),
+            "errors": sum(1 for _, status in results if status != 200),
+            "p50_s": round(_percentile(latencies, 0.5), 4) if latencies else None,
+            "p95_s": round(_percentile(latencies, 0.95), 4) if latencies else None,
+            "max_s": round(max(latencies), 4) if latencies else None,
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against local fixtures.")
+    parser.add_argument("--concurrency", default="1,2,4,8", help="Comma separated concurrency levels for /search")
+    parser.add_argument("--requests", type=int, default=8, help="/search requests per concurrency level")
+    parser.add_argument("--repeat", type=int, default=3, help="Page loads per site for the phase timings")
+    parser.add_argument("--latency-ms", type=int, default=0, help="Artificial fixture server latency")
+    parser.add_argument("--skip-browser", action="store_true", help="No Chrome: only sites with an HTTP fetcher, end to end only")
+    parser.add_argument("--execution", choices=("browsers", "tabs"), help="Override SCRAPER_EXECUTION for /search")
+    parser.add_argument("--output", help="Also write the report as JSON to this file")
+    args = parser.parse_args()
+    if args.execution:
+        os.environ["SCRAPER_EXECUTION"] = args.execution
+    # Fixture prices must not end up in the real price history
+    os.environ.setdefault("PRICE_HISTORY", "0")
+
+    server = FixtureServer(latency_ms=args.latency_ms).start()
+    server.point_scrapers_here()
+    try:
+        # Imported only now so the site modules pick up the fixture base URLs (and register themselves)
+        import scrape
+        from registry import SITES
+        sites = [name for name, info in SITES.items() if info.enabled and (info.fetch or not args.skip_browser)]
+
+        report = {"sites": sites}
+        if not args.skip_browser:
+            report["phases"] = bench_sites(sites, args.repeat)
+            report["blocking"] = bench_blocking(sites, args.repeat)
+        levels = [int(level) for level in args.concurrency.split(",")]
+        report["search"] = bench_search(levels, args.requests, sites)
+        report["execution"] = scrape.EXECUTION_MODE
+        # Resident memory of the pool's Chrome processes once the load is over (None without psutil)
+        report["browser_memory_mb"] = scrape.browser_pool.memory_mb()
+        scrape.browser_pool.close()
+    finally:
+        server.stop()
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from selenium.common.exceptions import WebDriverException
+
+from metrics import BROWSER_LAUNCH_SECONDS, LEASE_WAIT_SECONDS
+
+try:
+    import psutil
+except ImportError:  # Memory based recycling is skipped when psutil is not installed
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+
+def driver_rss_bytes(driver):
+    """Resident memory of a WebDriver's chromedriver and Chrome process tree, or None without psutil."""
+    if psutil is None:
+        return None
+    try:
+        process = psutil.Process(driver.service.process.pid)
+        return sum(p.memory_info().rss for p in [process] + process.children(recursive=True))
+    except Exception:
+        return None
+
+
+@dataclass
+class PooledBrowser:
+    """A WebDriver instance owned by the pool, plus its usage bookkeeping."""
+    driver: object
+    pages: int = 0
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class BrowserPool:
+    """
+    A fixed-size pool of warm Chrome WebDriver instances shared by all scrapers.
+
+    Browsers are launched up front by start(), leased to a scraper for one page,
+    reset (cookies, site storage and extra tabs cleared) when they come back, and recycled once
+    they have served max_pages pages, grown past max_memory_mb or crashed.
+
+    Args:
+        factory (callable): Zero-argument function returning a new WebDriver.
+        size (int): Maximum number of browsers alive at the same time.
+        max_pages (int): Pages a browser may serve before it is replaced.
+        max_memory_mb (int): RSS of the browser process tree above which it is replaced.
+        lease_timeout (float): Seconds lease() waits for a free browser before raising TimeoutError.
+    """
+
+    def __init__(self, factory, size=5, max_pages=50, max_memory_mb=1024, lease_timeout=60.0):
+        self._factory = factory
+        self.size = size
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.lease_timeout = lease_timeout
+
+        self._idle: list[PooledBrowser] = []
+        self._live = 0  # Browsers launched (or launching) and not yet quit
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self._launches = 0
+        self._launch_failures = 0
+        self._recycled = 0
+        self._crashed = 0
+        self._leases = 0
+        self._lease_wait_total = 0.0
+        self._lease_wait_max = 0.0
+
+    # --- Lifecycle ---
+    def start(self):
+        """Launch browsers until the pool is full so the first requests find them warm."""
+        while True:
+            with self._cond:
+                if self._closed or self._live >= self.size:
+                    return
+                self._live += 1
+            entry = self._launch()
+            if entry is None:
+                return
+            self._put_back(entry)
+
+    def close(self):
+        """Quit every idle browser and refuse further leases. Leased browsers are quit on release."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._live -= len(idle)
+            self._cond.notify_all()
+        for entry in idle:
+            self._quit(entry)
+
+    # --- Leasing ---
+    @contextmanager
+    def lease(self):
+        """
+        Borrow a browser for the duration of a with-block.
+
+        Yields:
+            webdriver: A reset, ready-to-use WebDriver instance.
+
+        Raises:
+            TimeoutError: If no browser became free within lease_timeout seconds.
+        """
+        entry = self._acquire()
+        try:
+            yield entry.driver
+        finally:
+            entry.pages += 1
+            self._release(entry)
+
+    def _acquire(self) -> PooledBrowser:
+        started = time.monotonic()
+        deadline = started + self.lease_timeout
+        launch = False
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Browser pool is closed")
+                if self._idle:
+                    entry = self._idle.pop()
+                    break
+                if self._live < self.size:
+                    self._live += 1
+                    launch = True
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No browser available after {self.lease_timeout}s")
+                self._cond.wait(remaining)
+
+        if launch:
+            entry = self._launch()
+            if entry is None:
+                raise RuntimeError("Could not launch a browser for the pool")
+
+        waited = time.monotonic() - started
+        LEASE_WAIT_SECONDS.observe(waited)
+        with self._cond:
+            self._leases += 1
+            self._lease_wait_total += waited
+            self._lease_wait_max = max(self._lease_wait_max, waited)
+        return entry
+
+    def _release(self, entry: PooledBrowser):
+        if self._closed:
+            self._discard(entry)
+            return
+        if entry.pages >= self.max_pages or self._over_memory(entry):
+            with self._cond:
+                self._recycled += 1
+            self._discard(entry, replace=True)
+            return
+        if not self._reset(entry):
+            with self._cond:
+                self._crashed += 1
+            self._discard(entry, replace=True)
+            return
+        self._put_back(entry)
+
+    # --- Browser management ---
+    def _launch(self):
+        """Start a browser for a slot already counted in _live. Returns None (and frees the slot) on failure."""
+        started = time.perf_counter()
+        try:
+            driver = self._factory()
+        except Exception as e:
+            logger.error("Browser pool failed to launch a browser: %s", e)
+            with self._cond:
+                self._live -= 1
+                self._launch_failures += 1
+                self._cond.notify()
+            return None
+        BROWSER_LAUNCH_SECONDS.observe(time.perf_counter() - started)
+        with self._cond:
+            self._launches += 1
+        return PooledBrowser(driver=driver)
+
+    def _put_back(self, entry: PooledBrowser):
+        with self._cond:
+            if self._closed:
+                self._live -= 1
+                closed = True
+            else:
+                self._idle.append(entry)
+                closed = False
+            self._cond.notify()
+        if closed:
+            self._quit(entry)
+
+    def _discard(self, entry: PooledBrowser, replace=False):
+        self._quit(entry)
+        with self._cond:
+            self._live -= 1
+            self._cond.notify()
+        if replace and not self._closed:
+            # Keep the pool warm: launch the replacement off the caller's thread
+            threading.Thread(target=self.start, daemon=True).start()
+
+    def _reset(self, entry: PooledBrowser) -> bool:
+        """
+        Close extra tabs, clear cookies and site storage and park on a blank page. False means the browser is dead.
+
+        Cookies are cleared over CDP for every domain; delete_all_cookies() only reaches the ones
+        visible to the current page. Local storage, IndexedDB and caches are cleared for the origin
+        the last lease left the browser on.
+        """
+        driver = entry.driver
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            if hasattr(driver, "execute_cdp_cmd"):
+                origin = driver.execute_script("return location.origin")
+                if origin and origin.startswith("http"):
+                    driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            else:
+                driver.delete_all_cookies()
+            driver.get("about:blank")
+            return True
+        except WebDriverException as e:
+            logger.warning("Browser pool dropping a crashed browser: %s", e)
+            return False
+        except Exception as e:
+            logger.warning("Browser pool could not reset a browser: %s", e)
+            return False
+
+    def _over_memory(self, entry: PooledBrowser) -> bool:
+        if not self.max_memory_mb:
+            return False
+        rss = driver_rss_bytes(entry.driver)
+        return rss is not None and rss > self.max_memory_mb * 1024 * 1024
+
+    @staticmethod
+    def _quit(entry: PooledBrowser):
+        try:
+            entry.driver.quit()
+        except Exception as e:
+            logger.warning("Browser pool could not quit a browser cleanly: %s", e)
+
+    # --- Introspection ---
+    def memory_mb(self):
+        """Total RSS of the idle browsers in MB, or None without psutil. Call while nothing is leased."""
+        with self._cond:
+            drivers = [entry.driver for entry in self._idle]
+        sizes = [driver_rss_bytes(driver) for driver in drivers]
+        if None in sizes:
+            return None
+        return round(sum(sizes) / (1024 * 1024), 1)
+
+    def stats(self) -> dict:
+        """Return a snapshot of pool occupancy, launch counts and lease wait times."""
+        with self._cond:
+            return {
+                "size": self.size,
+                "live": self._live,
+                "idle": len(self._idle),
+                "in_use": self._live - len(self._idle),
+                "launches": self._launches,
+                "launch_failures": self._launch_failures,
+                "recycled": self._recycled,
+                "crashed": self._crashed,
+                "leases": self._leases,
+                "lease_wait_total_s": round(self._lease_wait_total, 4),
+                "lease_wait_avg_s": round(self._lease_wait_total / self._leases, 4) if self._leases else 0.0,
+                "lease_wait_max_s": round(self._lease_wait_max, 4),
+            }
@@ -0,0 +1,87 @@
+import logging
+import os
+
+from selenium.webdriver.chrome.options import Options
+
+logger = logging.getLogger(__name__)
+
+HEADLESS = os.environ.get("BROWSER_HEADLESS", "1") != "0"
+IMAGES = os.environ.get("BROWSER_IMAGES", "0") != "0"
+# URL blocking through the DevTools protocol; SCRAPER_BLOCKING=0 loads everything (for comparisons)
+BLOCKING = os.environ.get("SCRAPER_BLOCKING", "1") != "0"
+
+# Requests no scraper needs: we only read text and hrefs. Patterns use Chrome's * wildcard.
+DEFAULT_BLOCKED_URLS = (
+    # Images and video (image blocking in the profile misses CSS backgrounds and <video>)
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.mp4", "*.webm", "*.m3u8",
+    # Fonts
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    # Ads and analytics
+    "*doubleclick.net*", "*googlesyndication.com*", "*google-analytics.com*", "*googletagmanager.com*",
+    "*googleadservices.com*", "*facebook.net*", "*connect.facebook.com*", "*hotjar.com*", "*criteo.*",
+    "*adsystem*", "*scorecardresearch.com*", "*clarity.ms*", "*branch.io*",
+)
+
+
+def chrome_options(page_load_strategy="normal", headless=HEADLESS, images=IMAGES) -> Options:
+    """
+    Chrome options for scraping: headless and without images unless asked otherwise.
+
+    Args:
+        page_load_strategy (str): "normal", or "none" to return from navigations at once.
+        headless (bool): Run without a window (BROWSER_HEADLESS, default on).
+        images (bool): Load images (BROWSER_IMAGES, default off).
+    """
+    options = Options()
+    options.page_load_strategy = page_load_strategy
+    if headless:
+        options.add_argument("--headless=new")
+        options.add_argument("--window-size=1920,1080")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--mute-audio")
+    if not images:
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    return options
+
+
+def blocked_urls(site_info) -> list:
+    """The site's blocklist: the defaults plus its block_urls, minus its allow_urls."""
+    allowed = set(site_info.allow_urls)
+    return [pattern for pattern in DEFAULT_BLOCKED_URLS + tuple(site_info.block_urls) if pattern not in allowed]
+
+
+def apply_blocking(browser, site_info):
+    """
+    Block the site's URL patterns in the browser (or tab) about to load it.
+
+    Uses Network.setBlockedURLs, so it only works with Chrome; other drivers, and SCRAPER_BLOCKING=0,
+    leave the page unrestricted.
+    """
+    if not BLOCKING or not hasattr(browser, "execute_cdp_cmd"):
+        return
+    try:
+        browser.execute_cdp_cmd("Network.enable", {})
+        browser.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls(site_info)})
+    except Exception as e:
+        logger.warning("Could not set blocked URLs for %s: %s", site_info.name, e)
+
+
+# JavaScript snippet measuring what the current page downloaded, for benchmarks
+_PAGE_WEIGHT_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+return {
+    bytes: (nav ? nav.transferSize : 0) + resources.reduce((sum, r) => sum + (r.transferSize || 0), 0),
+    requests: resources.length + 1,
+    load_ms: nav ? Math.round(nav.loadEventEnd || nav.domContentLoadedEventEnd || 0) : null
+};
+"""
+
+
+def page_weight(browser) -> dict:
+    """Bytes transferred, request count and load time (ms since navigation start) of the current page."""
+    return browser.execute_script(_PAGE_WEIGHT_SCRIPT)
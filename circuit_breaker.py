@@ -0,0 +1,128 @@
+import threading
+import time
+
+
+class CircuitOpen(Exception):
+    """Raised instead of scraping a site whose breaker is open."""
+
+
+# Breaker states, also the value of the circuit_state gauge
+CLOSED, HALF_OPEN, OPEN = 0, 1, 2
+_STATE_NAMES = {CLOSED: "closed", HALF_OPEN: "half_open", OPEN: "open"}
+
+
+class _Breaker:
+    def __init__(self, cooldown):
+        self.state = CLOSED
+        self.failures = 0  # Consecutive empty or failed scrapes
+        self.cooldown = cooldown
+        self.opened_at = 0.0
+        self.probing = False
+        self.skipped = 0
+        self.trips = 0
+
+
+class CircuitBreakers:
+    """
+    Per-site health tracker that stops scraping sites which keep coming back empty.
+
+    After failure_threshold consecutive empty or failed scrapes a site's breaker opens and the
+    site is skipped. Once cooldown seconds have passed one request is let through as a probe
+    (half open): if it finds products the breaker closes, otherwise it opens again for twice as
+    long, up to max_cooldown. A broken selector then costs one browser per cooldown instead of
+    one per request.
+
+    Args:
+        failure_threshold (int): Consecutive empty or failed scrapes that open the breaker.
+        cooldown (float): Seconds a newly opened breaker skips the site before probing.
+        max_cooldown (float): Upper bound for the cooldown after repeated failed probes.
+    """
+
+    def __init__(self, failure_threshold=3, cooldown=120.0, max_cooldown=1800.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def _get(self, site):
+        breaker = self._breakers.get(site)
+        if breaker is None:
+            breaker = self._breakers[site] = _Breaker(self.cooldown)
+        return breaker
+
+    def is_open(self, site) -> bool:
+        """True while the site is being skipped, i.e. open and not yet due for a probe."""
+        with self._lock:
+            breaker = self._get(site)
+            if breaker.state == OPEN and time.monotonic() - breaker.opened_at < breaker.cooldown:
+                return True
+            return breaker.state == HALF_OPEN and breaker.probing
+
+    def allow(self, site) -> bool:
+        """
+        Decide whether a scrape of site may run now. Call record() with its outcome afterwards.
+
+        Returns:
+            bool: True when closed, or when this call is the one probe of a breaker due for it.
+        """
+        with self._lock:
+            breaker = self._get(site)
+            if breaker.state == CLOSED:
+                return True
+            if breaker.state == OPEN and time.monotonic() - breaker.opened_at >= breaker.cooldown:
+                breaker.state = HALF_OPEN
+            if breaker.state == HALF_OPEN and not breaker.probing:
+                breaker.probing = True
+                return True
+            breaker.skipped += 1
+            return False
+
+    def record(self, site, ok):
+        """Record whether an allowed scrape of site returned products."""
+        with self._lock:
+            breaker = self._get(site)
+            if ok:
+                breaker.state = CLOSED
+                breaker.failures = 0
+                breaker.cooldown = self.cooldown
+                breaker.probing = False
+                return
+            breaker.failures += 1
+            if breaker.state == HALF_OPEN:
+                # The probe failed too; back off further before the next one
+                breaker.cooldown = min(breaker.cooldown * 2, self.max_cooldown)
+                self._open(breaker)
+            elif breaker.state == CLOSED and breaker.failures >= self.failure_threshold:
+                self._open(breaker)
+
+    def abandon(self, site):
+        """
+        Forget an allowed scrape that could not run, e.g. because no browser could be leased. Nothing
+        is counted for or against the site; a probe it held is given back for the next request.
+        """
+        with self._lock:
+            self._get(site).probing = False
+
+    def _open(self, breaker):
+        breaker.state = OPEN
+        breaker.opened_at = time.monotonic()
+        breaker.probing = False
+        breaker.trips += 1
+
+    def state(self, site) -> str:
+        """Return "closed", "half_open" or "open" for site."""
+        with self._lock:
+            return _STATE_NAMES[self._get(site).state]
+
+    def stats(self) -> dict:
+        """Return each site's state (0 closed, 1 half open, 2 open), consecutive failures, skips and trips."""
+        with self._lock:
+            breakers = dict(self._breakers)
+            return {
+                "state": {site: b.state for site, b in breakers.items()},
+                "consecutive_failures": {site: b.failures for site, b in breakers.items()},
+                "skipped": {site: b.skipped for site, b in breakers.items()},
+                "trips": {site: b.trips for site, b in breakers.items()},
+                "open": sorted(site for site, b in breakers.items() if b.state != CLOSED),
+            }
@@ -0,0 +1,143 @@
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from metrics import PARSE_FAILURES, PHASE_SECONDS
+
+# "bulk" pulls every container in one execute_script call, "elements" walks WebElements one call at a time
+EXTRACTION_MODE = os.environ.get("SCRAPER_EXTRACTION", "bulk")
+
+# Runs inside the page: arguments[0] is the container selector, arguments[1] the field specs
+_BULK_SCRIPT = """
+const [containerSelector, fields] = arguments;
+function pick(root, spec) {
+    for (const selector of spec.selectors) {
+        let el = selector ? root.querySelector(selector) : root;
+        if (el && spec.closest) el = el.closest(spec.closest);
+        if (!el) continue;
+        if (spec.attr === 'text') return el.innerText;
+        const value = el[spec.attr];
+        return typeof value === 'string' ? value : el.getAttribute(spec.attr);
+    }
+    return null;
+}
+const rows = Array.from(document.querySelectorAll(containerSelector), container => {
+    const row = {};
+    for (const [name, spec] of Object.entries(fields)) row[name] = pick(container, spec);
+    return row;
+});
+return JSON.stringify(rows);
+"""
+
+
+@dataclass
+class FieldSpec:
+    """
+    How to read one field out of a product container.
+
+    Attributes:
+        selectors (tuple[str, ...]): CSS selectors tried in order; the first match wins. "" means the container itself.
+        attr (str): "text" for the rendered text, otherwise a property/attribute name such as "href".
+        closest (str): Optional selector to walk up to from the matched element (e.g. the enclosing <a>).
+    """
+    selectors: tuple
+    attr: str = "text"
+    closest: str = ""
+
+    def __init__(self, *selectors, attr="text", closest=""):
+        self.selectors = selectors
+        self.attr = attr
+        self.closest = closest
+
+
+def extract_rows(browser, container_selector: str, fields: dict, site: str = "") -> list[dict]:
+    """
+    Read every field of every product container in a single WebDriver round trip.
+
+    Args:
+        browser (webdriver): Selenium WebDriver instance on a loaded results page.
+        container_selector (str): CSS selector matching one element per product.
+        fields (dict[str, FieldSpec]): Field name to extraction spec.
+        site (str, optional): Site name for the extract timing and parse failure metrics.
+
+    Returns:
+        list[dict]: One dict per container with a value (or None) for every field.
+    """
+    specs = {name: asdict(spec) for name, spec in fields.items()}
+    with PHASE_SECONDS.time(site=site, phase="extract"):
+        rows = json.loads(browser.execute_script(_BULK_SCRIPT, container_selector, specs) or "[]")
+    _count_missing(rows, fields, site)
+    return rows
+
+
+def extract_rows_from_html(html: str, container_selector: str, fields: dict, base_url: str = "", site: str = "") -> list[dict]:
+    """
+    Apply the same container and field selectors as extract_rows to raw HTML, without a browser.
+
+    Args:
+        html (str): Page source.
+        container_selector (str): CSS selector matching one element per product.
+        fields (dict[str, FieldSpec]): Field name to extraction spec.
+        base_url (str, optional): Used to make href/src attributes absolute, like the DOM properties are.
+        site (str, optional): Site name for the parse timing and parse failure metrics.
+
+    Returns:
+        list[dict]: One dict per container with a value (or None) for every field.
+    """
+    with PHASE_SECONDS.time(site=site, phase="parse"):
+        soup = BeautifulSoup(html, "html.parser")
+        rows = []
+        for container in soup.select(container_selector):
+            row = {}
+            for name, spec in fields.items():
+                row[name] = _pick_from_soup(container, spec, base_url)
+            rows.append(row)
+    _count_missing(rows, fields, site)
+    return rows
+
+
+def _count_missing(rows, fields, site):
+    for name, spec in fields.items():
+        missing = sum(1 for row in rows if row[name] is None)
+        if missing:
+            PARSE_FAILURES.inc(missing, site=site, selector=" | ".join(spec.selectors))
+
+
+def _pick_from_soup(container, spec: FieldSpec, base_url: str):
+    for selector in spec.selectors:
+        element = container.select_one(selector) if selector else container
+        if element is not None and spec.closest:
+            element = element.css.closest(spec.closest)
+        if element is None:
+            continue
+        if spec.attr == "text":
+            # Collapse whitespace the way innerText does, without splitting "1,299<span>.</span>"
+            return " ".join(element.get_text().split())
+        value = element.get(spec.attr)
+        if value and spec.attr in ("href", "src"):
+            value = urljoin(base_url, value)
+        return value
+    return None
+
+
+def compare_extraction(browser, extract_products) -> dict:
+    """
+    Run both extraction paths against the page currently loaded in browser.
+
+    Args:
+        browser (webdriver): Selenium WebDriver instance on a loaded results page.
+        extract_products (callable): A site's extract_products(browser, mode) function.
+
+    Returns:
+        dict: Per mode, the elapsed seconds and the number of products extracted.
+    """
+    report = {}
+    for mode in ("elements", "bulk"):
+        started = time.perf_counter()
+        products = extract_products(browser, mode)
+        report[mode] = {"seconds": round(time.perf_counter() - started, 4), "products": len(products)}
+    return report
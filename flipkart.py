@@ -1,17 +1,34 @@
+import logging
+import os
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from time import sleep
-from dataclasses import dataclass
+from product import Product
+from registry import SiteInfo, register
+from readiness import ReadinessSpec, wait_until_ready
+from extraction import EXTRACTION_MODE, FieldSpec, extract_rows, extract_rows_from_html
+from http_fetch import fetch_page
+from metrics import PHASE_SECONDS, field_timer
+from snapshots import capture_html, capture_page
 
-@dataclass
-class Product:
-    title: str
-    price_currency: str
-    price_whole: float
-    link: str
+logger = logging.getLogger(__name__)
 
-    def __str__(self):
-        return f"{self.title} - {self.price_currency}{self.price_whole} - {self.link}"
+# Overridable so benchmarks can point the scraper at a local fixture server
+BASE_URL = os.environ.get("FLIPKART_BASE_URL", "https://www.flipkart.com")
+CONTAINER_SELECTOR = "div.yKfJKb.row"
+
+READINESS = ReadinessSpec(site="flipkart", container_selector=CONTAINER_SELECTOR, timeout=10, stable_polls=2)
+
+# Field selectors for the single round trip extraction path
+FIELDS = {
+    "title": FieldSpec("div.KzDlHZ"),
+    "price_whole": FieldSpec("div.Nx9bqj._4b5DiR"),
+    "link": FieldSpec("div.KzDlHZ", attr="href", closest="a"),
+}
+
+def search_url(product_name: str) -> str:
+    """Build the Flipkart search results URL for product_name."""
+    query = product_name.replace(" ", "+")
+    return f"{BASE_URL}/search?q={query}"
 
 def scrape_flipkart_products(product_name: str, browser: webdriver) -> list[Product]:
     """
@@ -26,56 +43,133 @@ def scrape_flipkart_products(product_name: str, browser: webdriver) -> list[Prod
     """
     try:
         # Navigate to Flipkart search page
-        query = product_name.replace(" ", "+")
-        browser.get(f"https://www.flipkart.com/search?q={query}")
-        sleep(5)  # Wait for page to load
+        with PHASE_SECONDS.time(site="flipkart", phase="navigate"):
+            browser.get(search_url(product_name))
+        wait_until_ready(browser, READINESS)  # Wait until the result rows have rendered
+        capture_page(browser, "flipkart", product_name)
 
-        products = []
-        product_containers = browser.find_elements(by=By.CSS_SELECTOR, value="div.yKfJKb.row")
+        products = extract_products(browser)
 
-        for container in product_containers:
-            try:
-                # Extract title
+        # Sort products by price
+        products.sort(key=lambda x: x.price_whole)
+        return products
+
+    except Exception as e:
+        logger.error("Error during Flipkart scraping: %s", e)
+        return []
+
+def fetch_flipkart_products(product_name: str) -> tuple[list[Product], bool]:
+    """
+    Fetch Flipkart search results over plain HTTP, without a browser.
+
+    Args:
+        product_name (str): The product to search for (e.g., "iphone 16 pro max").
+
+    Returns:
+        tuple[list[Product], bool]: Products sorted by price, and whether the site served a block page.
+    """
+    page = fetch_page(search_url(product_name))
+    if page.blocked:
+        return [], True
+    capture_html("flipkart", product_name, page.url, page.html)
+    products = parse_html(page.html, page.url)
+    products.sort(key=lambda p: p.price_whole)
+    return products, False
+
+def parse_html(html: str, base_url: str = BASE_URL) -> list[Product]:
+    """
+    Extract products from the HTML of a Flipkart results page, fetched or from a snapshot.
+
+    Returns:
+        list[Product]: The valid products in page order.
+    """
+    return _parse_rows(extract_rows_from_html(html, CONTAINER_SELECTOR, FIELDS, base_url=base_url, site="flipkart"))
+
+def extract_products(browser: webdriver, mode: str = None) -> list[Product]:
+    """
+    Extract products from the results page currently loaded in browser.
+
+    Args:
+        browser (webdriver): Selenium WebDriver instance on a Flipkart results page.
+        mode (str, optional): "bulk" or "elements". Defaults to EXTRACTION_MODE.
+
+    Returns:
+        list[Product]: The valid products in page order.
+    """
+    if (mode or EXTRACTION_MODE) == "elements":
+        return _extract_with_elements(browser)
+    return _extract_with_script(browser)
+
+def _extract_with_script(browser: webdriver) -> list[Product]:
+    return _parse_rows(extract_rows(browser, CONTAINER_SELECTOR, FIELDS, site="flipkart"))
+
+def _parse_rows(rows: list[dict]) -> list[Product]:
+    products = []
+    for row in rows:
+        title = (row["title"] or "").strip()
+        try:
+            price_whole = float((row["price_whole"] or "0").replace(",", "").strip().strip("₹"))
+        except ValueError:
+            price_whole = 0.0  # Handle non-numeric prices (e.g., "Out of Stock")
+        if title and price_whole > 0:
+            products.append(Product(title=title, price_currency="₹", price_whole=price_whole, link=row["link"] or "", site="flipkart"))
+    return products
+
+def _extract_with_elements(browser: webdriver) -> list[Product]:
+    products = []
+    with PHASE_SECONDS.time(site="flipkart", phase="discover"):
+        product_containers = browser.find_elements(by=By.CSS_SELECTOR, value=CONTAINER_SELECTOR)
+
+    for container in product_containers:
+        try:
+            # Extract title
+            with field_timer("flipkart", "title", "div.KzDlHZ"):
                 title_element = container.find_element(by=By.CSS_SELECTOR, value="div.KzDlHZ")
                 title = title_element.text.strip() if title_element else ""
 
-                # Extract price
+            # Extract price
+            with field_timer("flipkart", "price_whole", "div.Nx9bqj._4b5DiR"):
                 price_whole_element = container.find_element(by=By.CSS_SELECTOR, value="div.Nx9bqj._4b5DiR")
                 price_whole_text = price_whole_element.text.replace(",", "").strip("₹") if price_whole_element else "0"
-                try:
-                    price_whole = float(price_whole_text)
-                except ValueError:
-                    price_whole = 0.0  # Handle non-numeric prices (e.g., "Out of Stock")
-                price_currency = "₹"
-
-                # Extract link (updated to find <a> containing the title)
-                try:
+            try:
+                price_whole = float(price_whole_text)
+            except ValueError:
+                price_whole = 0.0  # Handle non-numeric prices (e.g., "Out of Stock")
+            price_currency = "₹"
+
+            # Extract link (updated to find <a> containing the title)
+            try:
+                with field_timer("flipkart", "link", ".//a[.//div[@class='KzDlHZ']]"):
                     link_element = container.find_element(by=By.XPATH, value=".//a[.//div[@class='KzDlHZ']]")
                     link = link_element.get_attribute("href") if link_element else ""
-                except:
-                    link = ""  # Set empty link if not found
-
-                # Add product if title and price are valid (link is optional)
-                if title and price_whole > 0:
-                    product = Product(
-                        title=title,
-                        price_currency=price_currency,
-                        price_whole=price_whole,
-                        link=link
-                    )
-                    products.append(product)
-                    # print(f"Added: {title} - {price_whole} - {link}")
-                else:
-                    print(f"Skipped (invalid title or price): {title} - {price_whole}")
-
-            except Exception as e:
-                print(f"Error parsing product container: {e}")
-                continue
+            except:
+                link = ""  # Set empty link if not found
 
-        # Sort products by price
-        products.sort(key=lambda x: x.price_whole)
-        return products
+            # Add product if title and price are valid (link is optional)
+            if title and price_whole > 0:
+                product = Product(
+                    title=title,
+                    price_currency=price_currency,
+                    price_whole=price_whole,
+                    link=link,
+                    site="flipkart"
+                )
+                products.append(product)
+            else:
+                logger.debug("Skipped (invalid title or price): %s - %s", title, price_whole)
 
-    except Exception as e:
-        print(f"Error during Flipkart scraping: {e}")
-        return []
\ No newline at end of file
+        except Exception as e:
+            logger.debug("Error parsing product container: %s", e)
+            continue
+
+    return products
+
+register(SiteInfo(
+    name="flipkart",
+    scrape=scrape_flipkart_products,
+    fetch=fetch_flipkart_products,
+    regions=("in",),
+    currency="₹",
+    expected_cost=4.0,
+    block_urls=("*rukminim*",),  # Product image CDN
+))
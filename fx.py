@@ -0,0 +1,120 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fx_rates.json")
+
+
+class FxTable:
+    """
+    Exchange rates from a local JSON file, reloaded when the file changes.
+
+    The file holds {"base": "USD", "rates": {"USD": 1.0, "INR": 84.0, ...}}, each rate being units of
+    that currency per one unit of base. Prices are normalized into currency (the base by default).
+    The file's mtime is checked at most every reload_interval seconds, on use, so editing it takes
+    effect without a restart; a file that fails to parse keeps the previous rates. When there are
+    no usable rates at all (missing file, or no rate for currency) currency is None, nothing is
+    converted, and sorting falls back to each site's own prices (see normalized_price).
+
+    Args:
+        path (str): Path of the rates file.
+        currency (str, optional): ISO code to normalize into. Defaults to the file's base.
+        reload_interval (float): Seconds between checks for a changed file.
+    """
+
+    def __init__(self, path=DEFAULT_RATES_PATH, currency=None, reload_interval=300.0):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._requested_currency = currency
+        self.currency = None
+        self._rates = {}
+        self._mtime = None
+        self._checked_at = 0.0
+        self._loaded_at = None
+        self._reloads = 0
+        self._lock = threading.Lock()
+        self._maybe_reload(force=True)
+        if not self._rates:
+            logger.error("No usable FX rates in %s; prices are not normalized and sort by each site's own price",
+                         self.path)
+
+    # --- Loading ---
+    def _maybe_reload(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.reload_interval:
+            return
+        with self._lock:
+            if not force and now - self._checked_at < self.reload_interval:
+                return
+            self._checked_at = now
+            try:
+                mtime = os.path.getmtime(self.path)
+                if mtime == self._mtime:
+                    return
+                with open(self.path, encoding="utf-8") as f:
+                    table = json.load(f)
+                base = table["base"].upper()
+                rates = {code.upper(): float(rate) for code, rate in table["rates"].items() if float(rate) > 0}
+            except Exception as e:
+                logger.warning("Could not load FX rates from %s, keeping the previous table: %s", self.path, e)
+                return
+            rates.setdefault(base, 1.0)
+            currency = (self._requested_currency or base).upper()
+            if currency not in rates:
+                logger.warning("FX rates in %s have no rate for %s, keeping the previous table", self.path, currency)
+                return
+            self._rates, self.currency, self._mtime = rates, currency, mtime
+            self._loaded_at = time.time()
+            self._reloads += 1
+
+    # --- Conversion ---
+    def rate(self, code):
+        """Multiplier converting a price in code into self.currency, or None without a rate."""
+        self._maybe_reload()
+        rates = self._rates
+        if code not in rates or self.currency not in rates:
+            return None
+        return rates[self.currency] / rates[code]
+
+    def normalize(self, products):
+        """Set price_normalized on each product, looking up each currency's rate once."""
+        self._maybe_reload()
+        rates, target = self._rates, self.currency
+        multipliers = {}
+        for product in products:
+            code = product.currency
+            if code not in multipliers:
+                multipliers[code] = rates[target] / rates[code] if code in rates and target in rates else None
+            multiplier = multipliers[code]
+            product.price_normalized = round(product.price_whole * multiplier, 2) if multiplier is not None else None
+
+    def stats(self) -> dict:
+        """Return the target currency, rates, when they were loaded and how many times."""
+        return {
+            "currency": self.currency,
+            "rates": dict(self._rates),
+            "loaded_at": self._loaded_at,
+            "reloads": self._reloads,
+        }
+
+
+def normalized_price(product):
+    """
+    Sort key for normalized prices. Products without a rate sort last, grouped by currency and
+    ordered by their own price, so results still come out sorted when no rates are loaded.
+    """
+    price = product.price_normalized
+    if price is None:
+        return math.inf, product.currency, product.price_whole
+    return price, "", 0.0
+
+
+def filter_price(product):
+    """Price compared with min_price and max_price: the normalized one, else the site's own."""
+    price = product.price_normalized
+    return product.price_whole if price is None else price
@@ -0,0 +1,167 @@
+import random
+import re
+import zlib
+
+from product import encode_rows
+
+# Words that say nothing about which product a title names
+STOPWORDS = frozenset({"a", "an", "and", "the", "for", "with", "of", "in", "by", "to", "on", "new"})
+
+_TOKEN = re.compile(r"[a-z]+|\d+(?:\.\d+)?")
+_PRIME = (1 << 61) - 1
+
+
+def title_tokens(title) -> frozenset:
+    """
+    Lower-cased words and numbers of a title, without stopwords. "7ml" and "7 ml" give the same
+    tokens, and word order and punctuation do not matter.
+    """
+    return frozenset(token for token in _TOKEN.findall(title.lower()) if token not in STOPWORDS)
+
+
+def jaccard(a, b) -> float:
+    """Share of tokens two sets have in common."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """
+    MinHash signatures of token sets, split into LSH bands.
+
+    Two sets with Jaccard similarity s agree on a given signature slot with probability s, so they
+    share at least one band of rows slots with probability 1 - (1 - s**rows)**bands: about 0.5
+    for s = 0.5 with the defaults, and above 0.99 for s = 0.8.
+
+    Args:
+        bands (int): LSH bands; more bands find less similar pairs.
+        rows (int): Signature slots per band; more rows make a shared band stricter.
+        seed (int): Seed for the hash permutations, fixed so grouping is repeatable.
+    """
+
+    def __init__(self, bands=16, rows=4, seed=1):
+        self.bands = bands
+        self.rows = rows
+        rng = random.Random(seed)
+        self._perms = [(rng.randrange(1, _PRIME) | 1, rng.randrange(_PRIME)) for _ in range(bands * rows)]
+        self._token_hashes = {}  # Titles share most of their words, so each token is hashed once
+
+    def _hashes(self, token):
+        hashes = self._token_hashes.get(token)
+        if hashes is None:
+            x = zlib.crc32(token.encode())
+            hashes = self._token_hashes[token] = tuple((a * x + b) % _PRIME for a, b in self._perms)
+        return hashes
+
+    def signature(self, tokens) -> list:
+        """One minimum per permutation over the tokens' hashes."""
+        if not tokens:
+            return [0] * len(self._perms)
+        return list(map(min, zip(*map(self._hashes, tokens))))
+
+    def band_keys(self, signature):
+        """Yield a hashable key per band; sets sharing any key are candidate duplicates."""
+        rows = self.rows
+        for band in range(self.bands):
+            yield band, tuple(signature[band * rows:(band + 1) * rows])
+
+
+class ProductGroup:
+    """
+    Offers of what looks like the same product, on one or more sites.
+
+    Attributes:
+        offers (list[Product]): The offers, cheapest first.
+    """
+    __slots__ = ("offers",)
+
+    def __init__(self, offers):
+        self.offers = offers
+
+    @property
+    def best(self):
+        return self.offers[0]
+
+    @property
+    def sites(self) -> list:
+        return sorted({offer.site for offer in self.offers})
+
+    def to_dict(self) -> dict:
+        best = self.best
+        return {
+            "title": best.title,
+            "best_price": best.price_normalized,
+            "best_price_whole": best.price_whole,
+            "best_price_currency": best.price_currency,
+            "best_site": best.site,
+            "sites": self.sites,
+            "offers": [offer.to_dict() for offer in self.offers],
+        }
+
+
+def title_key(title) -> tuple:
+    """Split a title's tokens into (words, numbers)."""
+    tokens = title_tokens(title)
+    numbers = frozenset(token for token in tokens if token[0].isdigit())
+    return tokens - numbers, numbers
+
+
+def similarity(a, b) -> float:
+    """Token Jaccard similarity of two title_key()s, or 0.0 when the numbers in the titles disagree."""
+    words_a, numbers_a = a
+    words_b, numbers_b = b
+    # Sizes, shades and model numbers: one title may leave them out, but they must not conflict
+    if numbers_a and numbers_b and not (numbers_a <= numbers_b or numbers_b <= numbers_a):
+        return 0.0
+    return jaccard(words_a | numbers_a, words_b | numbers_b)
+
+
+def group_products(products, threshold=0.5, hasher=None) -> list:
+    """
+    Cluster near-duplicate titles into one ProductGroup per product.
+
+    Products are taken in order. Each one joins the group whose first product (its leader) it is
+    most similar to, if that reaches threshold, and otherwise starts a group of its own. Only
+    leaders sharing an LSH band with the product are compared, so the work grows with the number
+    of products rather than with every pair. Comparing against leaders, not against any member,
+    keeps near-duplicates of near-duplicates from chaining unrelated products together.
+
+    Args:
+        products (list[Product]): Products in the order to keep, e.g. sorted by normalized price.
+        threshold (float): Token Jaccard similarity at which two titles count as the same product.
+        hasher (MinHasher, optional): Signature and banding settings.
+
+    Returns:
+        list[ProductGroup]: Groups ordered by their first product; offers keep the input order,
+        so for price-sorted input each group starts with its best price and groups are cheapest first.
+    """
+    hasher = hasher or MinHasher()
+    keys = []
+    groups = []
+    leaders = {}  # band key -> indexes into groups of the leaders with that band
+    for product in products:
+        key = title_key(product.title)
+        band_keys = list(hasher.band_keys(hasher.signature(key[0] | key[1])))
+        best, best_score, compared = None, threshold, set()
+        for band_key in band_keys:
+            for n in leaders.get(band_key, ()):
+                if n in compared:
+                    continue
+                compared.add(n)
+                score = similarity(keys[n], key)
+                if score > best_score or (score == best_score and best is None):
+                    best, best_score = n, score
+        if best is not None:
+            groups[best].offers.append(product)
+            continue
+        keys.append(key)
+        groups.append(ProductGroup([product]))
+        for band_key in band_keys:
+            leaders.setdefault(band_key, []).append(len(groups) - 1)
+    return groups
+
+
+def encode_groups(groups) -> bytes:
+    """Serialize groups to a UTF-8 JSON array, like encode_products."""
+    return encode_rows([group.to_dict() for group in groups])
@@ -0,0 +1,81 @@
+import os
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Try the plain HTTP path before launching a browser (set to 0 to always use Selenium)
+HTTP_FIRST = os.environ.get("SCRAPER_HTTP_FIRST", "1") == "1"
+HTTP_TIMEOUT = float(os.environ.get("SCRAPER_HTTP_TIMEOUT", "8"))
+
+# Sent with every request so sites serve the same markup they give a desktop browser
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-IN,en;q=0.9",
+}
+
+# Pages that answer 200 but are really a bot wall
+DEFAULT_BLOCK_MARKERS = ("captcha", "robot check", "access denied", "are you a human")
+
+
+@dataclass
+class FetchResult:
+    """A fetched page and whether the site refused to serve real results."""
+    url: str
+    status: int
+    html: str
+    blocked: bool
+
+
+# --- Pooled Session ---
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    # Keep-alive connections are reused across requests and threads, up to pool_maxsize per host
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+session = _build_session()
+
+
+def fetch_page(url: str, block_markers=DEFAULT_BLOCK_MARKERS) -> FetchResult:
+    """
+    Fetch a page over the shared keep-alive session without running any JavaScript.
+
+    Args:
+        url (str): The page to fetch.
+        block_markers (tuple[str, ...]): Lower-case strings whose presence means a bot wall was served.
+
+    Returns:
+        FetchResult: The response body and a blocked flag (non-2xx status or a block marker found).
+    """
+    response = session.get(url, timeout=HTTP_TIMEOUT)
+    html = response.text
+    lowered = html[:20000].lower()
+    blocked = response.status_code >= 400 or any(marker in lowered for marker in block_markers)
+    return FetchResult(url=url, status=response.status_code, html=html, blocked=blocked)
+
+
+# --- Served-by bookkeeping ---
+_served = defaultdict(lambda: defaultdict(int))
+_lock = threading.Lock()
+
+
+def record_path(site: str, path: str):
+    """Count which path ("http", "browser", "http_blocked", "http_empty", "http_error") handled a site."""
+    with _lock:
+        _served[site][path] += 1
+
+
+def fetch_stats() -> dict:
+    """Return per-site counts of requests served over plain HTTP versus through the browser."""
+    with _lock:
+        return {site: dict(paths) for site, paths in _served.items()}
@@ -0,0 +1,109 @@
+import base64
+import heapq
+import itertools
+import math
+from dataclasses import dataclass
+
+from product import normalize_currency
+
+
+def _price(product):
+    return product.price_whole
+
+
+@dataclass
+class PageRequest:
+    """
+    Filters and page bounds for a merged search result.
+
+    Attributes:
+        limit (int): Products per page, or None for everything from offset on.
+        offset (int): Products to skip after filtering.
+        min_price (float): Lowest price to include, or None.
+        max_price (float): Highest price to include, or None.
+        currencies (frozenset[str]): ISO currency codes to include, or empty for all.
+    """
+    limit: int = None
+    offset: int = 0
+    min_price: float = None
+    max_price: float = None
+    currencies: frozenset = frozenset()
+
+    def accepts(self, product) -> bool:
+        return not self.currencies or product.currency in self.currencies
+
+
+def parse_currencies(value):
+    """Turn "INR,$" into the set of currency codes to filter on."""
+    return frozenset(normalize_currency(item) for item in value.split(",") if item.strip())
+
+
+def encode_cursor(offset):
+    """Opaque token for the next page, so clients do not build offsets themselves."""
+    return base64.urlsafe_b64encode(f"o:{offset}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return the offset a cursor points at. Raises ValueError for a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except Exception:
+        raise ValueError("malformed cursor")
+    prefix, _, offset = raw.partition(":")
+    if prefix != "o" or not offset.isdigit():
+        raise ValueError("malformed cursor")
+    return int(offset)
+
+
+def merge_sorted(site_lists, key=_price):
+    """
+    Lazily k-way merge per-site product lists into one stream in ascending key order.
+
+    Each scraper already returns its list sorted by price, so a heap merge costs O(n log k) for
+    k sites and only does work for the products actually consumed. A list that is not sorted
+    (e.g. from an older cache entry) is sorted first rather than breaking the merge order.
+    """
+    streams = []
+    for products in site_lists:
+        if any(key(a) > key(b) for a, b in zip(products, itertools.islice(products, 1, None))):
+            products = sorted(products, key=key)
+        streams.append(products)
+    return heapq.merge(*streams, key=key)
+
+
+def paginate(site_lists, page: PageRequest, key=_price, price=None):
+    """
+    Merge per-site results and return only the requested page.
+
+    When the sort key is the price itself the stream is ascending in it, so min_price and max_price
+    only trim its ends: products below min_price are skipped without filtering and max_price stops
+    the merge early. With a separate price (e.g. a key that puts products without a normalized
+    price last) every product is checked instead.
+
+    Args:
+        site_lists (list[list[Product]]): Each site's products, sorted by key.
+        page (PageRequest): Filters and bounds.
+        key (callable): Sort key, the price by default.
+        price (callable, optional): Price the bounds apply to, when it is not key.
+
+    Returns:
+        tuple[list[Product], int]: The page, and the offset of the next page or None if this is the last.
+    """
+    merged = merge_sorted(site_lists, key)
+    if price is not None:
+        low = -math.inf if page.min_price is None else page.min_price
+        high = math.inf if page.max_price is None else page.max_price
+        merged = (p for p in merged if low <= price(p) <= high)
+    else:
+        if page.min_price is not None:
+            merged = itertools.dropwhile(lambda p: key(p) < page.min_price, merged)
+        if page.max_price is not None:
+            merged = itertools.takewhile(lambda p: key(p) <= page.max_price, merged)
+    matching = (p for p in merged if page.accepts(p))
+    if page.limit is None:
+        return list(itertools.islice(matching, page.offset, None)), None
+    # Take one extra product to learn whether another page exists
+    window = list(itertools.islice(matching, page.offset, page.offset + page.limit + 1))
+    if len(window) > page.limit:
+        return window[:page.limit], page.offset + page.limit
+    return window, None
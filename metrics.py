@@ -0,0 +1,183 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; covers a cache hit (~ms) up to a slow Chrome page load
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+class Counter:
+    """A monotonically increasing count, optionally split by labels."""
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple((name, labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram, optionally split by labels."""
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label key -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple((name, labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a with-block, whether or not it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{_format_labels(key + (('le', bound),))} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(key + (('le', '+Inf'),))} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {round(series[-2], 6)}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series[-1]}")
+        return lines
+
+
+class StatsGauges:
+    """
+    Exposes the numeric values of a stats() dict as gauges named <prefix>_<key>.
+    Nested dicts become a label, e.g. scheduler running {"amazon": 2} -> scheduler_running{key="amazon"} 2.
+    """
+
+    def __init__(self, prefix, stats_fn, help_text):
+        self.prefix = prefix
+        self.stats_fn = stats_fn
+        self.help_text = help_text
+
+    def render(self):
+        lines = []
+        for key, value in self.stats_fn().items():
+            name = f"{self.prefix}_{key}"
+            if isinstance(value, bool) or value is None:
+                continue
+            if isinstance(value, (int, float)):
+                lines += [f"# HELP {name} {self.help_text}", f"# TYPE {name} gauge", f"{name} {value}"]
+            elif isinstance(value, dict):
+                samples = [(k, v) for k, v in value.items() if isinstance(v, (int, float)) and not isinstance(v, bool)]
+                if samples:
+                    lines += [f"# HELP {name} {self.help_text}", f"# TYPE {name} gauge"]
+                    lines += [f"{name}{_format_labels([('key', k)])} {v}" for k, v in samples]
+        return lines
+
+
+# --- Registry ---
+_collectors = []
+
+def register(collector):
+    """Add a metric or StatsGauges to the /metrics output. Returns it for assignment."""
+    _collectors.append(collector)
+    return collector
+
+def render() -> str:
+    """Render every registered collector in the Prometheus text exposition format."""
+    lines = []
+    for collector in _collectors:
+        try:
+            lines += collector.render()
+        except Exception as e:
+            lines.append(f"# {getattr(collector, 'name', getattr(collector, 'prefix', '?'))} unavailable: {_escape(e)}")
+    return "\n".join(lines) + "\n"
+
+
+# --- Scraper metrics ---
+PHASE_SECONDS = register(Histogram(
+    "scrape_phase_seconds",
+    "Time spent per scrape phase (navigate, wait, discover, extract, parse, http_fetch, total).",
+    ("site", "phase"),
+))
+FIELD_SECONDS = register(Histogram(
+    "scrape_field_seconds",
+    "Time to read one field from one product container on the per-element extraction path.",
+    ("site", "field"),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+))
+PARSE_FAILURES = register(Counter(
+    "scrape_parse_failures_total",
+    "Product containers where a field selector matched nothing or could not be parsed.",
+    ("site", "selector"),
+))
+SCRAPES = register(Counter(
+    "scrape_results_total",
+    "Finished site scrapes by outcome (ok, empty, error, or unavailable when no browser could be leased).",
+    ("site", "outcome"),
+))
+BROWSER_LAUNCH_SECONDS = register(Histogram(
+    "browser_launch_seconds",
+    "Time to launch a Chrome WebDriver for the pool.",
+))
+LEASE_WAIT_SECONDS = register(Histogram(
+    "browser_lease_wait_seconds",
+    "Time a scraper waited to lease a browser from the pool.",
+))
+SEARCH_SECONDS = register(Histogram(
+    "search_request_seconds",
+    "End to end latency of search endpoints.",
+    ("endpoint",),
+))
+GROUPING_SECONDS = register(Histogram(
+    "search_grouping_seconds",
+    "Time to group a merged search result into duplicate products (group=1).",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+))
+
+
+@contextmanager
+def field_timer(site, field, selector):
+    """Time one field read on the per-element path and count a parse failure for selector if it raises."""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        PARSE_FAILURES.inc(site=site, selector=selector)
+        raise
+    finally:
+        FIELD_SECONDS.observe(time.perf_counter() - started, site=site, field=field)
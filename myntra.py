@@ -1,21 +1,43 @@
+import logging
+import os
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from dataclasses import dataclass
+import json
+import re
 from urllib.parse import urljoin
 from selenium.common.exceptions import NoSuchElementException
+from product import Product
+from registry import SiteInfo, register
+from readiness import ReadinessSpec, wait_until_ready
+from extraction import EXTRACTION_MODE, FieldSpec, extract_rows, extract_rows_from_html
+from http_fetch import fetch_page
+from metrics import PHASE_SECONDS, field_timer
+from snapshots import capture_html, capture_page
 
-@dataclass
-class Product:
-    """A class to hold product information."""
-    title: str
-    price_currency: str
-    price_whole: float
-    link: str
+logger = logging.getLogger(__name__)
 
-    def __str__(self):
-        return f"{self.title} - {self.price_currency} {self.price_whole} - {self.link}"
+# Overridable so benchmarks can point the scraper at a local fixture server (keep the trailing slash)
+BASE_URL = os.environ.get("MYNTRA_BASE_URL", "https://www.myntra.com/")
+CONTAINER_SELECTOR = "li.product-base"
+
+READINESS = ReadinessSpec(site="myntra", container_selector=CONTAINER_SELECTOR, timeout=5)
+
+# Field selectors for the single round trip extraction path
+FIELDS = {
+    "brand": FieldSpec("h3.product-brand"),
+    "product": FieldSpec("h4.product-product"),
+    # Myntra may show a discounted price or a regular price
+    "price": FieldSpec("span.product-discountedPrice", "div.product-price"),
+    "link": FieldSpec("a", attr="href"),
+}
+
+# The server-rendered page carries the full result set as JSON in window.__myx
+EMBEDDED_STATE = re.compile(r"window\.__myx\s*=\s*(\{.*?\})\s*</script>", re.S)
+
+def search_url(product_name: str) -> str:
+    """Build the Myntra search results URL for product_name."""
+    query = product_name.replace(" ", "-")
+    return f"{BASE_URL}{query}"
 
 def scrape_myntra_products(product_name: str, browser: webdriver) -> list[Product]:
     """
@@ -30,59 +52,171 @@ def scrape_myntra_products(product_name: str, browser: webdriver) -> list[Produc
     """
     try:
         # Navigate to Myntra's search page
-        base_url = "https://www.myntra.com/"
-        query = product_name.replace(" ", "-")
-        browser.get(f"{base_url}{query}")
+        with PHASE_SECONDS.time(site="myntra", phase="navigate"):
+            browser.get(search_url(product_name))
 
         # Wait for the product containers to be present
-        wait = WebDriverWait(browser, 5)
-        product_containers = wait.until(
-            EC.presence_of_all_elements_located((By.CSS_SELECTOR, "li.product-base"))
-        )
-
-        products = []
-        for container in product_containers:
-            try:
-                # Extract the product brand and name to create a full title
+        wait_until_ready(browser, READINESS)
+        capture_page(browser, "myntra", product_name)
+        products = extract_products(browser)
+
+        # Sort products by price
+        products.sort(key=lambda p: p.price_whole)
+        return products
+
+    except Exception as e:
+        logger.error("An error occurred while scraping Myntra: %s", e)
+        return []
+
+def fetch_myntra_products(product_name: str) -> tuple[list[Product], bool]:
+    """
+    Fetch Myntra search results over plain HTTP by reading the JSON embedded in the page.
+
+    Args:
+        product_name (str): The product to search for (e.g., "lipstick").
+
+    Returns:
+        tuple[list[Product], bool]: Products sorted by price, and whether the site served a block page.
+    """
+    page = fetch_page(search_url(product_name))
+    if page.blocked:
+        return [], True
+    capture_html("myntra", product_name, page.url, page.html)
+    products = _parse_embedded_state(page.html)
+    products.sort(key=lambda p: p.price_whole)
+    return products, False
+
+def parse_html(html: str, base_url: str = BASE_URL) -> list[Product]:
+    """
+    Extract products from the HTML of a Myntra results page, fetched or from a snapshot.
+    Reads the embedded JSON when the page has it, otherwise the rendered product cards.
+
+    Returns:
+        list[Product]: The valid products in page order.
+    """
+    return _parse_embedded_state(html) or _parse_rows(
+        extract_rows_from_html(html, CONTAINER_SELECTOR, FIELDS, base_url=base_url, site="myntra"))
+
+def _parse_embedded_state(html: str) -> list[Product]:
+    match = EMBEDDED_STATE.search(html)
+    if not match:
+        return []
+    try:
+        state = json.loads(match.group(1))
+    except ValueError:
+        return []
+
+    products = []
+    for item in state.get("searchData", {}).get("results", {}).get("products", []):
+        title = f"{item.get('brand', '')} {item.get('additionalInfo') or item.get('productName', '')}".strip()
+        try:
+            price_whole = float(item.get("price") or 0)
+        except (TypeError, ValueError):
+            continue
+        if title and price_whole > 0:
+            products.append(Product(
+                title=title,
+                price_currency="Rs.",
+                price_whole=price_whole,
+                link=urljoin(BASE_URL, item.get("landingPageUrl") or ""),
+                site="myntra"
+            ))
+    return products
+
+def extract_products(browser: webdriver, mode: str = None) -> list[Product]:
+    """
+    Extract products from the results page currently loaded in browser.
+
+    Args:
+        browser (webdriver): Selenium WebDriver instance on a Myntra results page.
+        mode (str, optional): "bulk" or "elements". Defaults to EXTRACTION_MODE.
+
+    Returns:
+        list[Product]: The valid products in page order.
+    """
+    if (mode or EXTRACTION_MODE) == "elements":
+        return _extract_with_elements(browser)
+    return _extract_with_script(browser)
+
+def _extract_with_script(browser: webdriver) -> list[Product]:
+    return _parse_rows(extract_rows(browser, CONTAINER_SELECTOR, FIELDS, site="myntra"))
+
+def _parse_rows(rows: list[dict]) -> list[Product]:
+    products = []
+    for row in rows:
+        # Containers without brand, name or price are ads or placeholders
+        if not (row["brand"] and row["product"] and row["price"]):
+            continue
+        title = f"{row['brand'].strip()} {row['product'].strip()}"
+        try:
+            price_whole = float(row["price"].replace("Rs.", "").replace(",", "").strip())
+        except ValueError:
+            continue
+        if title and price_whole > 0:
+            products.append(Product(
+                title=title,
+                price_currency="Rs.",
+                price_whole=price_whole,
+                link=urljoin(BASE_URL, row["link"] or ""),
+                site="myntra"
+            ))
+    return products
+
+def _extract_with_elements(browser: webdriver) -> list[Product]:
+    with PHASE_SECONDS.time(site="myntra", phase="discover"):
+        product_containers = browser.find_elements(By.CSS_SELECTOR, CONTAINER_SELECTOR)
+
+    products = []
+    for container in product_containers:
+        try:
+            # Extract the product brand and name to create a full title
+            with field_timer("myntra", "brand", "h3.product-brand"):
                 brand_element = container.find_element(By.CSS_SELECTOR, "h3.product-brand")
+                brand = brand_element.text.strip()
+            with field_timer("myntra", "product", "h4.product-product"):
                 product_element = container.find_element(By.CSS_SELECTOR, "h4.product-product")
-                title = f"{brand_element.text.strip()} {product_element.text.strip()}"
+                title = f"{brand} {product_element.text.strip()}"
 
-                # Extract the product price
+            # Extract the product price
+            with field_timer("myntra", "price", "span.product-discountedPrice | div.product-price"):
                 try:
                     # Myntra may show a discounted price or a regular price
                     price_element = container.find_element(By.CSS_SELECTOR, "span.product-discountedPrice")
                 except NoSuchElementException:
                     # If no discounted price, look for the standard price
                     price_element = container.find_element(By.CSS_SELECTOR, "div.product-price")
-                
+
                 price_text = price_element.text.replace("Rs.", "").replace(",", "").strip()
                 price_whole = float(price_text)
-                price_currency = "Rs."
+            price_currency = "Rs."
 
-                # Extract the product link and make it absolute
+            # Extract the product link and make it absolute
+            with field_timer("myntra", "link", "a"):
                 link_element = container.find_element(By.TAG_NAME, "a")
                 relative_link = link_element.get_attribute("href")
-                link = urljoin(base_url, relative_link)
-
-                # Add valid products to the list
-                if title and price_whole > 0:
-                    products.append(Product(
-                        title=title,
-                        price_currency=price_currency,
-                        price_whole=price_whole,
-                        link=link
-                    ))
-            except Exception as e:
-                # This handles cases where a container might be an ad or otherwise empty
-                # print(f"Could not parse a product container: {e}")
-                continue
+            link = urljoin(BASE_URL, relative_link)
 
-        # Sort products by price
-        products.sort(key=lambda p: p.price_whole)
-        return products
+            # Add valid products to the list
+            if title and price_whole > 0:
+                products.append(Product(
+                    title=title,
+                    price_currency=price_currency,
+                    price_whole=price_whole,
+                    link=link,
+                    site="myntra"
+                ))
+        except Exception as e:
+            # This handles cases where a container might be an ad or otherwise empty
+            logger.debug("Could not parse a product container: %s", e)
+            continue
 
-    except Exception as e:
-        print(f"An error occurred while scraping Myntra: {e}")
-        return []
+    return products
 
+register(SiteInfo(
+    name="myntra",
+    scrape=scrape_myntra_products,
+    fetch=fetch_myntra_products,
+    regions=("in",),
+    currency="Rs.",
+    expected_cost=3.0,
+))
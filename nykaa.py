@@ -1,19 +1,38 @@
+import logging
+import os
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import NoSuchElementException
-from time import sleep
-from dataclasses import dataclass
+from product import Product
+from registry import SiteInfo, register
+from readiness import ReadinessSpec, wait_until_ready
+from extraction import EXTRACTION_MODE, FieldSpec, extract_rows, extract_rows_from_html
+from metrics import PHASE_SECONDS, field_timer
+from snapshots import capture_page
 
-@dataclass
-class Product:
-    """A dataclass to hold the scraped product information."""
-    title: str
-    price_currency: str
-    price_whole: float
-    link: str
+logger = logging.getLogger(__name__)
 
-    def __str__(self):
-        return f"{self.title} - {self.price_currency}{self.price_whole} - {self.link}"
+# Overridable so benchmarks can point the scraper at a local fixture server
+BASE_URL = os.environ.get("NYKAA_BASE_URL", "https://www.nykaa.com")
+CONTAINER_SELECTOR = "div.css-ifdzs8"
+
+# The listing is rendered client side from XHR responses, so also wait for the network to settle.
+# For the same reason the server HTML has no product cards, and Nykaa has no HTTP-only fetch.
+READINESS = ReadinessSpec(site="nykaa", container_selector=CONTAINER_SELECTOR, timeout=10, stable_polls=1, network_idle_ms=500)
+
+# Field selectors for the single round trip extraction path
+FIELDS = {
+    "title": FieldSpec("div.css-xrzmfa"),
+    "link": FieldSpec("a.css-qlopj4", attr="href"),
+    # The site has MRP and a final price. We are targeting the final price.
+    "price": FieldSpec("span.css-111z9ua"),
+}
+
+def search_url(product_name: str) -> str:
+    """Build the Nykaa search results URL for product_name."""
+    query = product_name.replace(" ", "+")
+    # Note: The URL is for the main Nykaa beauty site, not Nykaa Fashion
+    return f"{BASE_URL}/search/result/?q={query}"
 
 def scrape_nykaa_products(product_name: str, browser: webdriver) -> list[Product]:
     """
@@ -28,61 +47,121 @@ def scrape_nykaa_products(product_name: str, browser: webdriver) -> list[Product
     """
     try:
         # Navigate to the main Nykaa search page
-        query = product_name.replace(" ", "+")
-        # Note: The URL is for the main Nykaa beauty site, not Nykaa Fashion
-        browser.get(f"https://www.nykaa.com/search/result/?q={query}")
-        sleep(5)  # Allow time for the page to load dynamically
+        with PHASE_SECONDS.time(site="nykaa", phase="navigate"):
+            browser.get(search_url(product_name))
+        wait_until_ready(browser, READINESS)  # Wait for the dynamically loaded listing
+        capture_page(browser, "nykaa", product_name)
 
-        products = []
-        # Find all product containers on the page using the new selector
-        product_containers = browser.find_elements(by=By.CSS_SELECTOR, value="div.css-ifdzs8")
+        products = extract_products(browser)
 
-        for container in product_containers:
-            try:
-                # Extract the title
+        # Sort products by price in ascending order
+        products.sort(key=lambda p: p.price_whole)
+        return products
+
+    except Exception as e:
+        logger.error("An error occurred during the Nykaa scraping process: %s", e)
+        return []
+
+def parse_html(html: str, base_url: str = BASE_URL) -> list[Product]:
+    """
+    Extract products from the HTML of a rendered Nykaa results page, e.g. a stored snapshot.
+
+    Returns:
+        list[Product]: The valid products in page order.
+    """
+    return _parse_rows(extract_rows_from_html(html, CONTAINER_SELECTOR, FIELDS, base_url=base_url, site="nykaa"))
+
+def extract_products(browser: webdriver, mode: str = None) -> list[Product]:
+    """
+    Extract products from the results page currently loaded in browser.
+
+    Args:
+        browser (webdriver): Selenium WebDriver instance on a Nykaa results page.
+        mode (str, optional): "bulk" or "elements". Defaults to EXTRACTION_MODE.
+
+    Returns:
+        list[Product]: The valid products in page order.
+    """
+    if (mode or EXTRACTION_MODE) == "elements":
+        return _extract_with_elements(browser)
+    return _extract_with_script(browser)
+
+def _extract_with_script(browser: webdriver) -> list[Product]:
+    return _parse_rows(extract_rows(browser, CONTAINER_SELECTOR, FIELDS, site="nykaa"))
+
+def _parse_rows(rows: list[dict]) -> list[Product]:
+    products = []
+    for row in rows:
+        # Containers missing a field are ads or don't match the standard product structure
+        if not (row["title"] and row["price"]):
+            continue
+        title = row["title"].strip()
+        try:
+            price_whole = float(row["price"].replace(",", "").strip("₹"))
+        except ValueError:
+            price_whole = 0.0  # Handle cases where price might not be a number
+        if title and price_whole > 0:
+            products.append(Product(title=title, price_currency="₹", price_whole=price_whole, link=row["link"] or "", site="nykaa"))
+    return products
+
+def _extract_with_elements(browser: webdriver) -> list[Product]:
+    products = []
+    # Find all product containers on the page using the new selector
+    with PHASE_SECONDS.time(site="nykaa", phase="discover"):
+        product_containers = browser.find_elements(by=By.CSS_SELECTOR, value=CONTAINER_SELECTOR)
+
+    for container in product_containers:
+        try:
+            # Extract the title
+            with field_timer("nykaa", "title", "div.css-xrzmfa"):
                 title_element = container.find_element(by=By.CSS_SELECTOR, value="div.css-xrzmfa")
                 title = title_element.text.strip()
 
-                # Extract the link from the specific anchor tag
+            # Extract the link from the specific anchor tag
+            with field_timer("nykaa", "link", "a.css-qlopj4"):
                 link_element = container.find_element(by=By.CSS_SELECTOR, value="a.css-qlopj4")
                 link = link_element.get_attribute("href") if link_element else ""
 
-                # Extract the discounted price
-                # The site has MRP and a final price. We are targeting the final price.
+            # Extract the discounted price
+            # The site has MRP and a final price. We are targeting the final price.
+            with field_timer("nykaa", "price", "span.css-111z9ua"):
                 price_element = container.find_element(by=By.CSS_SELECTOR, value="span.css-111z9ua")
                 price_text = price_element.text.replace(",", "").strip("₹")
-                
-                try:
-                    price_whole = float(price_text)
-                except ValueError:
-                    price_whole = 0.0  # Handle cases where price might not be a number
-
-                price_currency = "₹"
-
-                # Add the product if title and price are valid
-                if title and price_whole > 0:
-                    product = Product(
-                        title=title,
-                        price_currency=price_currency,
-                        price_whole=price_whole,
-                        link=link
-                    )
-                    products.append(product)
-                else:
-                    print(f"Skipped product due to missing title or zero price.")
-
-            except NoSuchElementException:
-                # This handles cases where a container is an ad or doesn't match the standard product structure
-                # print("Skipped a non-standard product container.")
-                continue
-            except Exception as e:
-                # print(f"Could not parse a product container: {e}")
-                continue # Move to the next container if another error occurs
+            
+            try:
+                price_whole = float(price_text)
+            except ValueError:
+                price_whole = 0.0  # Handle cases where price might not be a number
 
-        # Sort products by price in ascending order
-        products.sort(key=lambda p: p.price_whole)
-        return products
+            price_currency = "₹"
 
-    except Exception as e:
-        print(f"An error occurred during the Nykaa scraping process: {e}")
-        return []
+            # Add the product if title and price are valid
+            if title and price_whole > 0:
+                product = Product(
+                    title=title,
+                    price_currency=price_currency,
+                    price_whole=price_whole,
+                    link=link,
+                    site="nykaa"
+                )
+                products.append(product)
+            else:
+                logger.debug("Skipped product due to missing title or zero price.")
+
+        except NoSuchElementException:
+            # This handles cases where a container is an ad or doesn't match the standard product structure
+            logger.debug("Skipped a non-standard product container.")
+            continue
+        except Exception as e:
+            logger.debug("Could not parse a product container: %s", e)
+            continue # Move to the next container if another error occurs
+
+    return products
+
+register(SiteInfo(
+    name="nykaa",
+    scrape=scrape_nykaa_products,
+    regions=("in",),
+    currency="₹",
+    expected_cost=4.0,
+))
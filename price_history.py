@@ -0,0 +1,195 @@
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    id INTEGER PRIMARY KEY,
+    scraped_at REAL NOT NULL,
+    site TEXT NOT NULL,
+    query TEXT NOT NULL,
+    title TEXT NOT NULL,
+    link TEXT NOT NULL,
+    price_whole REAL NOT NULL,
+    price_currency TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    price_normalized REAL,
+    normalized_currency TEXT
+);
+CREATE INDEX IF NOT EXISTS prices_query ON prices (query, scraped_at);
+CREATE INDEX IF NOT EXISTS prices_site_query ON prices (site, query, scraped_at);
+CREATE INDEX IF NOT EXISTS prices_link ON prices (link, scraped_at);
+"""
+
+_COLUMNS = ("scraped_at", "site", "query", "title", "link", "price_whole", "price_currency", "currency",
+            "price_normalized", "normalized_currency")
+
+
+class PriceHistory:
+    """
+    SQLite store of every scraped product, written off the request path.
+
+    record() only puts rows on a bounded queue; a writer thread inserts them in one transaction
+    per batch_size rows or flush_interval seconds, whichever comes first. When the queue is full
+    rows are dropped and counted rather than slowing scrapes down. Reads open their own
+    connection, so they never wait behind the writer (the database runs in WAL mode).
+
+    Args:
+        path (str): SQLite database file.
+        batch_size (int): Rows per write transaction at most.
+        flush_interval (float): Seconds a row may wait before its batch is written.
+        max_queue (int): Rows buffered before new ones are dropped.
+    """
+
+    def __init__(self, path, batch_size=500, flush_interval=2.0, max_queue=50000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._counters = {"written": 0, "batches": 0, "dropped": 0, "errors": 0}
+
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+        self._writer = threading.Thread(target=self._write_loop, name="price-history", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    # --- Writing ---
+    def record(self, site, query, products, currency=None):
+        """
+        Queue products scraped from site for query. Never blocks.
+
+        Args:
+            site (str): Site name.
+            query (str): Normalized query.
+            products (list[Product]): Products, with price_normalized already set (None without a rate).
+            currency (str, optional): Currency of price_normalized.
+        """
+        scraped_at = time.time()
+        for p in products:
+            row = (scraped_at, site, query, p.title, p.link, p.price_whole, p.price_currency, p.currency,
+                   p.price_normalized, currency if p.price_normalized is not None else None)
+            try:
+                self._queue.put_nowait(row)
+            except queue.Full:
+                self._count("dropped")
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            if batch[0] is None:
+                conn.close()
+                return
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    row = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if row is None:
+                    stop = True
+                    break
+                batch.append(row)
+            self._write(conn, batch)
+            if stop:
+                conn.close()
+                return
+
+    def _write(self, conn, batch):
+        try:
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO prices ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})", batch)
+        except sqlite3.Error as e:
+            self._count("errors")
+            logger.warning("Price history write of %d rows failed: %s", len(batch), e)
+            return
+        with self._lock:
+            self._counters["written"] += len(batch)
+            self._counters["batches"] += 1
+
+    def close(self, timeout=10.0):
+        """Write what is still queued and stop the writer."""
+        self._queue.put(None)
+        self._writer.join(timeout)
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    # --- Reading ---
+    def history(self, query, site=None, link=None, since=None, limit=100):
+        """
+        Return recorded prices for a normalized query, newest first.
+
+        Args:
+            query (str): Normalized query.
+            site (str, optional): Only this site.
+            link (str, optional): Only this product.
+            since (float, optional): Only rows scraped at or after this Unix time.
+            limit (int): Rows at most.
+        """
+        clauses, params = ["query = ?"], [query]
+        for column, value in (("site", site), ("link", link)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("scraped_at >= ?")
+            params.append(since)
+        params.append(limit)
+        return self._read(
+            f"SELECT {', '.join(_COLUMNS)} FROM prices WHERE {' AND '.join(clauses)} ORDER BY scraped_at DESC LIMIT ?",
+            params)
+
+    def lowest(self, query, site=None, since=None, limit=10):
+        """
+        Return the cheapest price seen for each product of a normalized query, cheapest first.
+
+        Args:
+            query (str): Normalized query.
+            site (str, optional): Only this site.
+            since (float, optional): Only rows scraped at or after this Unix time.
+            limit (int): Products at most.
+        """
+        clauses, params = ["query = ?", "price_normalized IS NOT NULL"], [query]
+        if site:
+            clauses.append("site = ?")
+            params.append(site)
+        if since is not None:
+            clauses.append("scraped_at >= ?")
+            params.append(since)
+        params.append(limit)
+        # SQLite fills the bare columns from the row holding the MIN
+        return self._read(
+            "SELECT MIN(price_normalized) AS price_normalized, normalized_currency, price_whole, price_currency, "
+            "title, site, link, scraped_at, COUNT(*) AS observations "
+            f"FROM prices WHERE {' AND '.join(clauses)} GROUP BY link ORDER BY price_normalized LIMIT ?",
+            params)
+
+    def _read(self, sql, params):
+        with closing(self._connect()) as conn:
+            return [dict(row) for row in conn.execute(sql, params).fetchall()]
+
+    def stats(self) -> dict:
+        """Return rows written, batches, drops, write errors and the current queue depth."""
+        with self._lock:
+            stats = dict(self._counters)
+        stats["queued"] = self._queue.qsize()
+        return stats
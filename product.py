@@ -0,0 +1,101 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # Optional; the standard json module is used without it
+    orjson = None
+
+# Price symbols as the sites print them, mapped to ISO 4217 codes
+CURRENCY_CODES = {
+    "₹": "INR",
+    "Rs.": "INR",
+    "Rs": "INR",
+    "$": "USD",
+}
+
+# Digits after the decimal point per currency, for price_minor
+MINOR_UNITS = {"INR": 2, "USD": 2}
+
+
+def normalize_currency(symbol: str) -> str:
+    """Map a printed symbol ("Rs.", "₹", "$") or a code ("inr") to its ISO code. Unknown values are upper-cased."""
+    symbol = (symbol or "").strip()
+    return CURRENCY_CODES.get(symbol) or symbol.upper()
+
+
+class Product:
+    """
+    A product found by a scraper. Every site module builds these.
+
+    Slotted rather than a dataclass: a search can hold thousands of them and each one skips its
+    __dict__. Only the scraped fields and price_normalized are stored; currency (ISO code) and
+    price_minor (integer price in the currency's minor unit, e.g. paise) are computed on access,
+    which costs a dict lookup rather than an extra string reference and int per product.
+
+    Attributes:
+        title (str): Product title.
+        price_currency (str): Currency symbol as shown on the site.
+        price_whole (float): Price in major units.
+        link (str): Absolute product URL.
+        site (str): Name of the site it was scraped from.
+        currency (str): ISO 4217 code for price_currency.
+        price_minor (int): price_whole in minor units.
+        price_normalized (float): Price converted to the FX table's currency, set at merge time
+            (None until then, or when there is no rate for the currency).
+    """
+    __slots__ = ("title", "price_currency", "price_whole", "link", "site", "price_normalized")
+
+    def __init__(self, title, price_currency, price_whole, link, site=""):
+        self.title = title
+        self.price_currency = price_currency
+        self.price_whole = price_whole
+        self.link = link
+        self.site = site
+        self.price_normalized = None
+
+    @property
+    def currency(self) -> str:
+        return normalize_currency(self.price_currency)
+
+    @property
+    def price_minor(self) -> int:
+        return round(self.price_whole * 10 ** MINOR_UNITS.get(self.currency, 2))
+
+    def to_dict(self) -> dict:
+        """Shallow dict for JSON responses; every value is already a plain str, float or int."""
+        return {
+            "title": self.title,
+            "price_currency": self.price_currency,
+            "price_whole": self.price_whole,
+            "link": self.link,
+            "site": self.site,
+            "currency": self.currency,
+            "price_minor": self.price_minor,
+            "price_normalized": self.price_normalized,
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, Product):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None  # Mutable, like the dataclasses it replaces
+
+    def __repr__(self):
+        return (f"Product(title={self.title!r}, price_currency={self.price_currency!r}, "
+                f"price_whole={self.price_whole!r}, link={self.link!r}, site={self.site!r})")
+
+    def __str__(self):
+        return f"{self.title} - {self.price_currency} {self.price_whole} - {self.link}"
+
+
+def encode_products(products) -> bytes:
+    """Serialize products to a UTF-8 JSON array, using orjson when it is installed."""
+    return encode_rows([product.to_dict() for product in products])
+
+
+def encode_rows(rows) -> bytes:
+    """Serialize a list of plain dicts to a UTF-8 JSON array, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(rows)
+    return json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode()
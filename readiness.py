@@ -0,0 +1,131 @@
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+
+from selenium.webdriver.common.by import By
+
+from metrics import PHASE_SECONDS
+
+# JavaScript snippet returning everything a readiness check needs in one WebDriver round trip
+_PROBE_SCRIPT = """
+return [
+    document.readyState,
+    document.querySelectorAll(arguments[0]).length,
+    performance.getEntriesByType('resource').length
+];
+"""
+
+
+@dataclass
+class ReadinessSpec:
+    """
+    Describes when a site's search page is ready to be scraped.
+
+    Attributes:
+        site (str): Site name used when reporting time-to-ready.
+        container_selector (str): CSS selector of a product container.
+        timeout (float): Seconds to wait before giving up and scraping whatever is on the page.
+        min_count (int): Containers that must be present.
+        stable_polls (int): Consecutive polls the container count must stay unchanged (0 disables).
+        network_idle_ms (int): Milliseconds without new network resources required (0 disables).
+        poll_interval (float): Seconds between polls.
+    """
+    site: str
+    container_selector: str
+    timeout: float = 10.0
+    min_count: int = 1
+    stable_polls: int = 0
+    network_idle_ms: int = 0
+    poll_interval: float = 0.2
+
+
+@dataclass
+class ReadyResult:
+    """Outcome of a readiness wait."""
+    ready: bool
+    elapsed: float
+    count: int
+
+
+# --- Time-to-ready bookkeeping ---
+_samples = defaultdict(lambda: deque(maxlen=500))
+_timeouts = defaultdict(int)
+_lock = threading.Lock()
+
+
+def wait_until_ready(browser, spec: ReadinessSpec) -> ReadyResult:
+    """
+    Poll the current page until it satisfies spec, or until spec.timeout elapses.
+
+    The page is ready once the container selector matches at least min_count elements and,
+    when enabled, the count has been stable for stable_polls polls and no new network
+    resources have been requested for network_idle_ms.
+
+    Args:
+        browser (webdriver): Selenium WebDriver instance that already navigated to the page.
+        spec (ReadinessSpec): The site's readiness conditions.
+
+    Returns:
+        ReadyResult: Whether the page became ready, the actual time waited and the container count.
+    """
+    started = time.monotonic()
+    deadline = started + spec.timeout
+    last_count = -1
+    stable = 0
+    last_resources = -1
+    resources_changed_at = started
+    count = 0
+
+    while True:
+        now = time.monotonic()
+        try:
+            state, count, resources = browser.execute_script(_PROBE_SCRIPT, spec.container_selector)
+        except Exception:
+            # Page is mid-navigation; fall back to a plain element lookup
+            state, resources = "loading", last_resources
+            try:
+                count = len(browser.find_elements(By.CSS_SELECTOR, spec.container_selector))
+            except Exception:
+                # Still no document to query (navigations return immediately in tab mode)
+                count = 0
+
+        stable = stable + 1 if count == last_count else 0
+        last_count = count
+        if resources != last_resources:
+            last_resources = resources
+            resources_changed_at = now
+
+        ready = (
+            count >= spec.min_count
+            and stable >= spec.stable_polls
+            and (not spec.network_idle_ms or (state == "complete" and (now - resources_changed_at) * 1000 >= spec.network_idle_ms))
+        )
+        if ready or now >= deadline:
+            break
+        time.sleep(min(spec.poll_interval, max(deadline - now, 0)))
+
+    elapsed = time.monotonic() - started
+    PHASE_SECONDS.observe(elapsed, site=spec.site, phase="wait")
+    with _lock:
+        _samples[spec.site].append(elapsed)
+        if not ready:
+            _timeouts[spec.site] += 1
+    return ReadyResult(ready=ready, elapsed=elapsed, count=count)
+
+
+def readiness_stats() -> dict:
+    """Return per-site time-to-ready percentiles (seconds) over the most recent waits."""
+    with _lock:
+        snapshot = {site: sorted(samples) for site, samples in _samples.items()}
+        timeouts = dict(_timeouts)
+    stats = {}
+    for site, samples in snapshot.items():
+        stats[site] = {
+            "count": len(samples),
+            "timeouts": timeouts.get(site, 0),
+            "p50_s": round(samples[len(samples) // 2], 3),
+            "p95_s": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+            "max_s": round(samples[-1], 3),
+        }
+    return stats
@@ -0,0 +1,114 @@
+import os
+from dataclasses import dataclass
+
+# Accepted spellings of each region code for the location query parameter
+LOCATION_ALIASES = {
+    "in": "in",
+    "india": "in",
+    "us": "us",
+    "usa": "us",
+    "united states": "us",
+}
+
+# Comma separated site names to switch off without a code change (e.g. while a selector is broken)
+DISABLED_SITES = {name.strip() for name in os.environ.get("SCRAPER_DISABLED_SITES", "").split(",") if name.strip()}
+
+
+@dataclass
+class SiteInfo:
+    """
+    Everything the orchestrator needs to know about a site.
+
+    Attributes:
+        name (str): Site name, also used in cache keys, stats and responses.
+        scrape (callable): scrape_<site>_products(product_name, browser).
+        fetch (callable): Optional fetch_<site>_products(product_name) HTTP-only path.
+        regions (tuple[str, ...]): Region codes the site sells to (see LOCATION_ALIASES).
+        currency (str): Currency symbol the site's prices are in.
+        expected_cost (float): Typical seconds per scrape; the most expensive sites are dispatched first.
+        enabled (bool): Disabled sites are never dispatched.
+        block_urls (tuple[str, ...]): URL patterns to block on top of browser_profile.DEFAULT_BLOCKED_URLS.
+        allow_urls (tuple[str, ...]): Default patterns this site needs loaded (e.g. a script it renders with).
+    """
+    name: str
+    scrape: object
+    fetch: object = None
+    regions: tuple = ()
+    currency: str = ""
+    expected_cost: float = 5.0
+    enabled: bool = True
+    block_urls: tuple = ()
+    allow_urls: tuple = ()
+
+
+SITES = {}
+
+
+def register(info: SiteInfo):
+    """Add a site to the registry. Called at import time by each site module."""
+    if info.name in DISABLED_SITES:
+        info.enabled = False
+    SITES[info.name] = info
+
+
+def normalize_location(location):
+    """
+    Map a location query value to a region code.
+
+    Returns:
+        str or None: The region code, or None when no location was given.
+
+    Raises:
+        ValueError: If the location is not one of LOCATION_ALIASES.
+    """
+    if not location:
+        return None
+    region = LOCATION_ALIASES.get(" ".join(location.lower().split()))
+    if region is None:
+        raise ValueError(f"Unsupported location '{location}'")
+    return region
+
+
+def scrape_region(info: SiteInfo, location=None) -> str:
+    """
+    The region a scrape of a site for a location counts as, for cache and coalescing keys.
+
+    Aliases resolve to one code, and no location counts as the site's only region when it has one,
+    so location=in, location=india and no location share a scrape of a site that only sells in India.
+    Raises ValueError for an unsupported location.
+    """
+    region = normalize_location(location)
+    if region is None and len(info.regions) == 1:
+        return info.regions[0]
+    return region or ""
+
+
+def select_sites(location=None, include=None, exclude=None) -> list[SiteInfo]:
+    """
+    Pick the enabled sites serving a location, narrowed by include/exclude lists.
+
+    Args:
+        location (str, optional): Location as sent by the client; None means every region.
+        include (list[str], optional): Only these site names.
+        exclude (list[str], optional): Never these site names.
+
+    Returns:
+        list[SiteInfo]: Matching sites, most expensive first.
+
+    Raises:
+        ValueError: For an unsupported location or an unknown site name.
+    """
+    region = normalize_location(location)
+    unknown = [name for name in (include or []) + (exclude or []) if name not in SITES]
+    if unknown:
+        raise ValueError(f"Unknown site(s): {', '.join(unknown)}")
+
+    selected = [
+        info for info in SITES.values()
+        if info.enabled
+        and (region is None or region in info.regions)
+        and (not include or info.name in include)
+        and (not exclude or info.name not in exclude)
+    ]
+    selected.sort(key=lambda info: info.expected_cost, reverse=True)
+    return selected
@@ -0,0 +1,204 @@
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:  # Only needed for the shared RedisBackend
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(product_name: str) -> str:
+    """Lower-case and collapse whitespace so "iPhone  16" and "iphone 16" share a cache entry."""
+    return " ".join(product_name.lower().split())
+
+
+# --- Backends ---
+class InMemoryBackend:
+    """
+    Process-local LRU store. Holds at most max_entries keys and evicts the least recently used.
+    """
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, stored_at, value, expire_after):
+        with self._lock:
+            self._entries[key] = (stored_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisBackend:
+    """
+    Shared store so several server processes reuse each other's scrapes. Redis enforces the
+    memory bound (configure maxmemory-policy allkeys-lru) and drops keys once they are too stale.
+    Values are pickled, so only point this at a Redis instance you trust. There is no __len__:
+    counting keys takes a SCAN of the whole keyspace, too slow for every /stats request and
+    /metrics scrape, so stats() reports entries as None with this backend.
+
+    Args:
+        url (str): Redis connection URL, e.g. "redis://localhost:6379/0" for a local stand-in.
+        prefix (str): Key prefix, so the cache can share a database with other data.
+    """
+
+    def __init__(self, url, prefix="scrape:"):
+        if redis is None:
+            raise RuntimeError("RedisBackend needs the 'redis' package (pip install redis)")
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+        self.evictions = 0  # Evictions happen inside Redis
+
+    def get(self, key):
+        raw = self._client.get(self._prefix + "|".join(key))
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key, stored_at, value, expire_after):
+        self._client.set(self._prefix + "|".join(key), pickle.dumps((stored_at, value)), ex=max(int(expire_after), 1))
+
+
+# --- Cache ---
+class ResultCache:
+    """
+    TTL cache of scraper results keyed by (site, normalized query, location), with stale-while-revalidate.
+
+    An entry younger than its site's TTL is served as a hit. One older than the TTL but within
+    stale_ttl more seconds is served immediately as stale while a background refresh runs. Anything
+    older is a miss and is scraped synchronously. Empty results are not stored, since they usually
+    mean the scrape failed.
+
+    Args:
+        backend: InMemoryBackend or RedisBackend.
+        ttls (dict[str, float]): Per-site freshness in seconds.
+        default_ttl (float): Freshness for sites missing from ttls.
+        stale_ttl (float): Extra seconds an expired entry may still be served while it refreshes.
+    """
+
+    def __init__(self, backend, ttls=None, default_ttl=600, stale_ttl=1800):
+        self.backend = backend
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stale": 0, "refreshes": 0, "errors": 0}
+
+    def lookup(self, site, product_name, location, refresh=None):
+        """
+        Return the cached products for a site and query without scraping, or None on a miss.
+
+        A stale entry is returned as well; refresh() is then called once per key to scrape it again
+        in the background and must return a Future of the fresh products, which are stored when it
+        resolves. Callers pick where that scrape runs (scrape.py queues it on the scheduler).
+
+        Args:
+            site (str): Site name.
+            product_name (str): The query as sent by the client.
+            location (str): Requested location, or None.
+            refresh (callable, optional): Zero-argument function starting a scrape and returning its Future.
+
+        Returns:
+            tuple[list, str] or None: The products and "hit" or "stale", or None when they must be scraped.
+        """
+        key = self._key(site, product_name, location)
+        ttl = self.ttls.get(site, self.default_ttl)
+        entry = self._get(key)
+        if entry is not None:
+            age = time.time() - entry[0]
+            if age <= ttl:
+                self._count("hits")
+                return entry[1], "hit"
+            if age <= ttl + self.stale_ttl:
+                self._count("stale")
+                if refresh is not None:
+                    self._refresh_in_background(key, ttl, refresh)
+                return entry[1], "stale"
+        self._count("misses")
+        return None
+
+    def store(self, site, product_name, location, products):
+        """Cache a fresh scrape of a site for a query. Empty results are skipped."""
+        self._store(self._key(site, product_name, location), self.ttls.get(site, self.default_ttl), products)
+
+    @staticmethod
+    def _key(site, product_name, location):
+        return site, normalize_query(product_name), (location or "").lower()
+
+    def _get(self, key):
+        try:
+            return self.backend.get(key)
+        except Exception as e:
+            self._count("errors")
+            logger.warning("Result cache read failed: %s", e)
+            return None
+
+    def _store(self, key, ttl, products):
+        if not products:
+            return
+        try:
+            self.backend.set(key, time.time(), products, ttl + self.stale_ttl)
+        except Exception as e:
+            self._count("errors")
+            logger.warning("Result cache write failed: %s", e)
+
+    def _refresh_in_background(self, key, ttl, refresh):
+        with self._lock:
+            # One refresh per key, however many callers see it stale
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def done(future):
+            try:
+                self._store(key, ttl, future.result())
+                self._count("refreshes")
+            except Exception as e:
+                self._count("errors")
+                logger.warning("Result cache refresh failed for %s: %s", key, e)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        try:
+            future = refresh()
+        except Exception as e:
+            with self._lock:
+                self._refreshing.discard(key)
+            self._count("errors")
+            logger.warning("Result cache refresh could not start for %s: %s", key, e)
+            return
+        future.add_done_callback(done)
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self) -> dict:
+        """Return hit/miss/stale counters and the backend's size (None for Redis) and eviction count."""
+        with self._lock:
+            counters = dict(self._counters)
+        counters["entries"] = len(self.backend) if hasattr(self.backend, "__len__") else None
+        counters["evictions"] = self.backend.evictions
+        lookups = counters["hits"] + counters["stale"] + counters["misses"]
+        counters["hit_ratio"] = round((counters["hits"] + counters["stale"]) / lookups, 4) if lookups else 0.0
+        return counters
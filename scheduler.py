@@ -0,0 +1,147 @@
+import concurrent.futures
+import contextvars
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from dataclasses import dataclass, field
+
+
+class Overloaded(Exception):
+    """Raised by Scheduler.admit() when the queue is too deep to take another request."""
+
+
+@dataclass
+class _Task:
+    request_id: str
+    site: str
+    fn: object
+    args: tuple
+    # Context of the submitting request (e.g. its request id for logs), restored while the task runs
+    context: contextvars.Context = field(default_factory=contextvars.copy_context)
+    future: concurrent.futures.Future = field(default_factory=concurrent.futures.Future)
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+class Scheduler:
+    """
+    Process-wide scheduler for scrape tasks, replacing a thread pool per request.
+
+    At most max_sessions tasks run at once overall and at most site_limits[site] (or
+    default_site_limit) per site. Queued tasks are served round-robin across requests, so one
+    large request cannot starve the others, and a task whose site is saturated does not block
+    tasks for other sites behind it.
+
+    Args:
+        max_sessions (int): Global concurrency, normally the browser pool size.
+        default_site_limit (int): Concurrent tasks allowed per site unless overridden.
+        site_limits (dict[str, int], optional): Per-site overrides.
+        max_queue (int): Queued tasks above which admit() raises Overloaded.
+    """
+
+    def __init__(self, max_sessions=5, default_site_limit=2, site_limits=None, max_queue=50):
+        self.max_sessions = max_sessions
+        self.default_site_limit = default_site_limit
+        self.site_limits = site_limits or {}
+        self.max_queue = max_queue
+
+        self._queues = OrderedDict()  # request_id -> deque of _Task, in round-robin order
+        self._queued = 0
+        self._running = defaultdict(int)  # site -> running tasks
+        self._cond = threading.Condition()
+
+        self._rejected = 0
+        self._completed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+        for i in range(max_sessions):
+            threading.Thread(target=self._worker, name=f"scheduler-{i}", daemon=True).start()
+
+    # --- Admission ---
+    def admit(self):
+        """
+        Check there is room for another request before fanning it out.
+
+        Raises:
+            Overloaded: If max_queue tasks are already waiting.
+        """
+        with self._cond:
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                raise Overloaded(f"{self._queued} scrape tasks already queued")
+
+    def submit(self, request_id, site, fn, *args) -> concurrent.futures.Future:
+        """
+        Queue fn(*args) on behalf of request_id for a site.
+
+        Returns:
+            Future: Resolves with fn's return value (or exception) once a slot was free and fn ran.
+        """
+        task = _Task(request_id=request_id, site=site, fn=fn, args=args)
+        with self._cond:
+            self._queues.setdefault(request_id, deque()).append(task)
+            self._queued += 1
+            self._cond.notify()
+        return task.future
+
+    # --- Dispatch ---
+    def _site_limit(self, site):
+        return self.site_limits.get(site, self.default_site_limit)
+
+    def _next_task(self):
+        """Pop the first runnable task in round-robin request order. Caller holds the lock."""
+        for request_id in list(self._queues):
+            queue = self._queues[request_id]
+            for i, task in enumerate(queue):
+                if self._running[task.site] < self._site_limit(task.site):
+                    del queue[i]
+                    if queue:
+                        # This request had its turn; the next one goes first
+                        self._queues.move_to_end(request_id)
+                    else:
+                        del self._queues[request_id]
+                    return task
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                task = self._next_task()
+                while task is None:
+                    self._cond.wait()
+                    task = self._next_task()
+                self._queued -= 1
+                self._running[task.site] += 1
+                waited = time.monotonic() - task.queued_at
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+
+            try:
+                if task.future.set_running_or_notify_cancel():
+                    try:
+                        task.future.set_result(task.context.run(task.fn, *task.args))
+                    except BaseException as e:
+                        task.future.set_exception(e)
+            finally:
+                with self._cond:
+                    self._running[task.site] -= 1
+                    self._completed += 1
+                    # A site slot freed up, which may unblock a task any worker skipped over
+                    self._cond.notify_all()
+
+    # --- Introspection ---
+    def stats(self) -> dict:
+        """Return queue depth, running tasks per site, rejections and queue wait times."""
+        with self._cond:
+            started = self._completed + sum(self._running.values())
+            return {
+                "max_sessions": self.max_sessions,
+                "queue_depth": self._queued,
+                "max_queue": self.max_queue,
+                "queued_requests": len(self._queues),
+                "running": {site: n for site, n in self._running.items() if n},
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "queue_wait_avg_s": round(self._wait_total / started, 4) if started else 0.0,
+                "queue_wait_max_s": round(self._wait_max, 4),
+            }
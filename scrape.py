@@ -1,103 +1,798 @@
+import argparse
 import concurrent.futures
-from flask import Flask, jsonify, request
+import contextvars
+import json
+import logging
+import os
+import time
+import uuid
+from flask import Flask, Response, g, jsonify, request, stream_with_context
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from dataclasses import asdict
+from dataclasses import dataclass, field, replace
 
-# Assuming your scraper functions are in separate files as indicated
-# Create these files (amazon.py, flipkart.py, etc.) in the same directory
-from amazon import scrape_amazon_products
-from flipkart import scrape_flipkart_products
-from target import scrape_target_products
-from myntra import scrape_myntra_products
-from nykaa import scrape_nykaa_products
+# Each site module (amazon.py, flipkart.py, etc.) registers itself with the registry when imported
+import amazon, flipkart, target, myntra, nykaa
+from registry import SITES, scrape_region, select_sites
+from browser_pool import BrowserPool
+from browser_profile import apply_blocking, chrome_options
+from tab_pool import TabPool
+from extraction import EXTRACTION_MODE
+from readiness import readiness_stats
+from http_fetch import HTTP_FIRST, fetch_stats, record_path
+from result_cache import InMemoryBackend, RedisBackend, ResultCache, normalize_query
+from singleflight import SingleFlight
+from scheduler import Overloaded, Scheduler
+from circuit_breaker import CircuitBreakers, CircuitOpen
+from product import encode_products
+from fx import DEFAULT_RATES_PATH, FxTable, filter_price, normalized_price
+from price_history import PriceHistory
+from grouping import encode_groups, group_products
+from merge import PageRequest, decode_cursor, encode_cursor, paginate, parse_currencies
+import metrics
+from metrics import GROUPING_SECONDS, PHASE_SECONDS, SCRAPES, SEARCH_SECONDS, StatsGauges
+from logs import configure_logging, request_id_var
+
+configure_logging()
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
+# --- Deadlines ---
+# Time budget for a /search call when the client does not pass deadline_ms
+DEFAULT_DEADLINE_MS = int(os.environ.get("SEARCH_DEADLINE_MS", "30000"))
+# Scrapes that overrun a deadline are allowed to finish for the cache, but not for chromedriver's
+# default 300 s: a hung navigation or script fails after this long and hands its browser back
+PAGE_LOAD_TIMEOUT = float(os.environ.get("BROWSER_PAGE_LOAD_TIMEOUT", DEFAULT_DEADLINE_MS / 1000))
+SCRIPT_TIMEOUT = float(os.environ.get("BROWSER_SCRIPT_TIMEOUT", DEFAULT_DEADLINE_MS / 1000))
+
 # --- WebDriver Initialization ---
-def initialize_browser():
-    chrome_options = Options()
-    # chrome_options.add_argument("--headless")
-    # chrome_options.add_argument("--disable-gpu")
-    # chrome_options.add_argument("--no-sandbox")
-    # chrome_options.add_argument("--window-size=1920,1080")
-    # chrome_options.add_argument("--disable-dev-shm-usage")
+def initialize_browser(page_load_strategy="normal", **profile):
+    # Headless, no images; see browser_profile for the BROWSER_HEADLESS / BROWSER_IMAGES switches
+    options = chrome_options(page_load_strategy, **profile)
     service = Service(executable_path="chromedriver-mac-arm64/chromedriver")
-    browser = webdriver.Chrome(service=service, options=chrome_options)
+    browser = webdriver.Chrome(service=service, options=options)
+    browser.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+    browser.set_script_timeout(SCRIPT_TIMEOUT)
     return browser
-# --- Scraper Mapping ---
-# A list of all available scraper functions
-ALL_SCRAPERS = [
-    scrape_amazon_products,
-    scrape_flipkart_products,
-    scrape_target_products,
-    scrape_myntra_products,
-    scrape_nykaa_products,
-]
-
-def run_scraper(scraper_function, product_name):
-    """
-    Initializes a browser, runs a single scraper function, and cleans up.
-    This function is designed to be run in a separate thread.
-    """
-    browser = None
-    try:
-        browser = initialize_browser()
-        products = scraper_function(product_name, browser)
-        return products
+
+# --- Browser Pool ---
+# "browsers": warm browsers shared by every request instead of one cold Chrome launch per scraper per call.
+# "tabs": one Chrome, each scrape in its own tab, for less memory and fewer launches.
+EXECUTION_MODE = os.environ.get("SCRAPER_EXECUTION", "browsers")
+
+def build_browser_pool():
+    """Creates the BrowserPool or TabPool selected by SCRAPER_EXECUTION, sized by BROWSER_POOL_* env vars."""
+    size = int(os.environ.get("BROWSER_POOL_SIZE", "5"))
+    lease_timeout = float(os.environ.get("BROWSER_POOL_LEASE_TIMEOUT", "60"))
+    if EXECUTION_MODE == "tabs":
+        if EXTRACTION_MODE == "elements":
+            raise ValueError("SCRAPER_EXECUTION=tabs needs SCRAPER_EXTRACTION=bulk: elements are not bound to a tab")
+        return TabPool(
+            lambda: initialize_browser(page_load_strategy="none"),
+            size=size,
+            max_pages=int(os.environ.get("BROWSER_POOL_MAX_PAGES", "200")),
+            lease_timeout=lease_timeout,
+        )
+    if EXECUTION_MODE != "browsers":
+        raise ValueError(f"SCRAPER_EXECUTION must be 'browsers' or 'tabs', not {EXECUTION_MODE!r}")
+    return BrowserPool(
+        initialize_browser,
+        size=size,
+        max_pages=int(os.environ.get("BROWSER_POOL_MAX_PAGES", "50")),
+        max_memory_mb=int(os.environ.get("BROWSER_POOL_MAX_MEMORY_MB", "1024")),
+        lease_timeout=lease_timeout,
+    )
+
+browser_pool = build_browser_pool()
+
+# --- Result Cache ---
+# Seconds a site's results stay fresh; listings on the marketplaces move faster than on the beauty sites
+CACHE_TTLS = {
+    "amazon": 600,
+    "flipkart": 600,
+    "target": 900,
+    "myntra": 1800,
+    "nykaa": 1800,
+}
+
+def build_result_cache():
+    """Creates the result cache from CACHE_BACKEND ('memory' or 'redis') and related env vars."""
+    if os.environ.get("CACHE_BACKEND", "memory") == "redis":
+        backend = RedisBackend(os.environ.get("REDIS_URL", "redis://localhost:6379/0"))
+    else:
+        backend = InMemoryBackend(max_entries=int(os.environ.get("CACHE_MAX_ENTRIES", "1000")))
+    return ResultCache(backend, ttls=CACHE_TTLS, stale_ttl=float(os.environ.get("CACHE_STALE_TTL", "1800")))
+
+result_cache = build_result_cache()
+
+# --- Scheduler ---
+# One process-wide queue for scrape tasks, so N concurrent requests cannot start 5N browsers
+scheduler = Scheduler(
+    max_sessions=int(os.environ.get("SCHEDULER_MAX_SESSIONS", browser_pool.size)),
+    default_site_limit=int(os.environ.get("SCHEDULER_SITE_LIMIT", "2")),
+    max_queue=int(os.environ.get("SCHEDULER_MAX_QUEUE", "50")),
+)
+
+# Identical scrapes already running for another request are joined instead of started again
+inflight_scrapes = SingleFlight()
+
+# --- Circuit Breakers ---
+# Sites whose selectors broke stop getting browsers until a periodic probe finds products again
+circuit_breakers = CircuitBreakers(
+    failure_threshold=int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", "3")),
+    cooldown=float(os.environ.get("CIRCUIT_COOLDOWN", "120")),
+    max_cooldown=float(os.environ.get("CIRCUIT_MAX_COOLDOWN", "1800")),
+)
+
+# --- FX Normalization ---
+# Sites price in ₹ and $; merged results are sorted and filtered on one currency
+fx_table = FxTable(
+    path=os.environ.get("FX_RATES_PATH", DEFAULT_RATES_PATH),
+    currency=os.environ.get("FX_CURRENCY") or None,
+    reload_interval=float(os.environ.get("FX_RELOAD_SECONDS", "300")),
+)
+
+# --- Price History ---
+# Every fresh scrape is kept in SQLite, so past and lowest prices are served without a browser.
+# PRICE_HISTORY=0 switches it off.
+price_history = PriceHistory(
+    os.environ.get("PRICE_HISTORY_PATH", "price_history.sqlite3"),
+    batch_size=int(os.environ.get("PRICE_HISTORY_BATCH", "500")),
+    flush_interval=float(os.environ.get("PRICE_HISTORY_FLUSH_SECONDS", "2")),
+) if os.environ.get("PRICE_HISTORY", "1") != "0" else None
+
+# --- Running Scrapers ---
+# HTTP fetches need no browser, so they run on their own threads instead of taking a scheduler slot
+http_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=int(os.environ.get("HTTP_FETCH_WORKERS", "16")), thread_name_prefix="http-fetch")
+
+# Scheduler request id for stale-while-revalidate refreshes, which share slots fairly with requests
+REFRESH_REQUEST_ID = "cache-refresh"
+
+def run_scraper(site_info, product_name):
+    """
+    Runs a single site's scraper, over plain HTTP when the site allows it, otherwise by leasing
+    a browser from the pool and handing it back afterwards. Blocks until done, in the calling thread;
+    the server goes through submit_scraper instead.
+    Raises:
+        CircuitOpen: If the site's circuit breaker is skipping it.
+    """
+    site = site_info.name
+    if not circuit_breakers.allow(site):
+        raise CircuitOpen(f"{site} is skipped after repeated empty results")
+    started = time.perf_counter()
+    try:
+        products = fetch_over_http(site_info, product_name)
+        if not products:
+            products = scrape_in_browser(site_info, product_name)
+    except Exception:
+        _record_unavailable(site)
+        raise
+    return _record_outcome(site_info, product_name, products, time.perf_counter() - started)
+
+
+class ScrapeFailed(Exception):
+    """Set on a submit_scraper Future when the site's scraper raised, so callers can tell it from no results."""
+
+
+def submit_scraper(site_info, product_name, request_id):
+    """
+    Starts a single site's scraper without blocking. The HTTP fetch runs on http_executor; only
+    when it is off, fails or finds nothing is the browser scrape queued on the scheduler, so
+    scheduler slots are only ever held by scrapes that lease a browser.
+    Args:
+        site_info (SiteInfo): The site to scrape.
+        product_name (str): The product to search for.
+        request_id (str): Whose turn the browser scrape takes in the scheduler's round-robin.
+    Returns:
+        Future: Resolves with the products. Raises CircuitOpen if the site's breaker skips it,
+        ScrapeFailed if the scraper raised, or the pool's error if no browser could be leased.
+    """
+    site = site_info.name
+    outcome = concurrent.futures.Future()
+    if not circuit_breakers.allow(site):
+        outcome.set_exception(CircuitOpen(f"{site} is skipped after repeated empty results"))
+        return outcome
+    # The request's context (its id on log lines) is carried over to whichever thread runs each stage
+    context = contextvars.copy_context()
+    worked = []  # Seconds spent in each stage, excluding time queued
+
+    def timed(fn, *args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            worked.append(time.perf_counter() - started)
+
+    def finish(future):
+        try:
+            products = future.result()
+        except BaseException as e:
+            _record_unavailable(site)
+            outcome.set_exception(e)
+            return
+        recorded = _record_outcome(site_info, product_name, products, sum(worked))
+        if products is None:
+            outcome.set_exception(ScrapeFailed(f"{site_info.scrape.__name__} raised"))
+        else:
+            outcome.set_result(recorded)
+
+    def after_http(future=None):
+        # fetch_over_http never raises
+        if future is not None and future.result():
+            finish(future)
+            return
+        context.copy().run(scheduler.submit, request_id, site, timed, scrape_in_browser, site_info, product_name) \
+            .add_done_callback(finish)
+
+    if HTTP_FIRST and site_info.fetch:
+        http_executor.submit(context.copy().run, timed, fetch_over_http, site_info, product_name) \
+            .add_done_callback(after_http)
+    else:
+        after_http()
+    return outcome
+
+
+def _record_outcome(site_info, product_name, products, elapsed):
+    """Counts a finished scrape for metrics and the circuit breaker, and records its prices."""
+    site = site_info.name
+    PHASE_SECONDS.observe(elapsed, site=site, phase="total")
+    SCRAPES.inc(site=site, outcome="ok" if products else ("error" if products is None else "empty"))
+    circuit_breakers.record(site, bool(products))
+    if products and price_history is not None:
+        fx_table.normalize(products)
+        price_history.record(site, normalize_query(product_name), products, fx_table.currency)
+    return products or []
+
+
+def _record_unavailable(site):
+    """Counts a scrape that never reached the site (no browser could be leased); the breaker ignores it."""
+    SCRAPES.inc(site=site, outcome="unavailable")
+    circuit_breakers.abandon(site)
+
+
+def fetch_over_http(site_info, product_name):
+    """Tries the site's HTTP fetch when it has one. Returns the products, or None to fall back to the browser."""
+    site = site_info.name
+    if not (HTTP_FIRST and site_info.fetch):
+        return None
+    try:
+        with PHASE_SECONDS.time(site=site, phase="http_fetch"):
+            products, blocked = site_info.fetch(product_name)
+        if products:
+            record_path(site, "http")
+            return products
+        record_path(site, "http_blocked" if blocked else "http_empty")
     except Exception as e:
-        # Log the error for the specific scraper
-        print(f"Error in {scraper_function.__name__}: {e}")
-        return [] # Return an empty list if a scraper fails
-    finally:
-        if browser:
-            browser.quit()
+        record_path(site, "http_error")
+        logger.warning("HTTP fetch failed for %s, falling back to the browser: %s", site, e)
+    return None
+
+
+def scrape_in_browser(site_info, product_name):
+    """
+    Scrapes a site with a browser leased from the pool. Returns None when the scraper raised.
+    Raises:
+        TimeoutError, RuntimeError: When the pool could not lease a browser (saturated, closed or
+            failing to launch Chrome). That says nothing about the site, so it is not returned as a
+            failed scrape.
+    """
+    site = site_info.name
+    record_path(site, "browser")
+    with browser_pool.lease() as browser:
+        try:
+            apply_blocking(browser, site_info)
+            return site_info.scrape(product_name, browser)
+        except Exception as e:
+            # Log the error for the specific scraper
+            logger.error("Error in %s: %s", site_info.scrape.__name__, e, extra={"site": site})
+            return None
+
+
+@dataclass
+class SiteResult:
+    """The outcome of one site's scrape within a search."""
+    site: str
+    products: list = field(default_factory=list)
+    elapsed: float = 0.0  # Seconds since the fan-out started
+    # "ok" (scraped now), "cached", "stale" (served while refreshing), "timeout", "circuit_open" (skipped)
+    # or "error" (the scraper raised, or no browser could be leased)
+    status: str = "ok"
+
+
+def _scrape_and_cache(site_info, product_name, region, request_id):
+    """Starts a scrape for a cache miss. Returns a Future of (products, "miss") that caches the products first."""
+    cached = concurrent.futures.Future()
+
+    def store(future):
+        try:
+            products = future.result()
+        except BaseException as e:
+            cached.set_exception(e)
+            return
+        result_cache.store(site_info.name, product_name, region, products)
+        cached.set_result((products, "miss"))
+
+    submit_scraper(site_info, product_name, request_id).add_done_callback(store)
+    return cached
+
+
+def iter_scraper_results(product_name, sites, deadline=None, location=None):
+    """
+    Runs the given sites' scrapers concurrently and yields each one's products as soon as it finishes.
+    Args:
+        product_name (str): The product to search for.
+        sites (list[SiteInfo]): Sites to scrape, from registry.select_sites.
+        deadline (float, optional): Seconds to wait in total. Sites still running when it passes
+            are yielded with status "timeout"; they keep running in the background and their
+            result lands in the cache for the next identical query.
+        location (str, optional): Part of the cache key, as the region it resolves to (see registry.scrape_region).
+    Cached results (fresh or stale) are answered in the calling thread, so they never wait for a
+    scheduler slot; stale ones are refreshed through the scheduler. Sites whose circuit breaker is
+    open and that have nothing cached are yielded with status "circuit_open".
+    Yields:
+        SiteResult for every site, in completion order.
+    """
+    started = time.monotonic()
+    # The scheduler shares its slots fairly between request ids; outside a request make one up
+    request_id = request_id_var.get()
+    if request_id == "-":
+        request_id = uuid.uuid4().hex
+    # Start a scrape for every cache miss, joining any identical scrape already in flight.
+    # The futures are only waited on, never cancelled, so each caller keeps its own deadline.
+    future_to_site = {}
+    for site_info in sites:
+        breaker_open = circuit_breakers.is_open(site_info.name)
+        refresh = None if breaker_open else (
+            lambda site_info=site_info: submit_scraper(site_info, product_name, REFRESH_REQUEST_ID))
+        region = scrape_region(site_info, location)
+        cached = result_cache.lookup(site_info.name, product_name, region, refresh=refresh)
+        if cached is not None or breaker_open:
+            future = concurrent.futures.Future()
+            if cached is not None:
+                future.set_result(cached)
+            else:
+                future.set_exception(CircuitOpen(f"{site_info.name} is skipped after repeated empty results"))
+        else:
+            key = (site_info.name, normalize_query(product_name), region)
+            future, _joined = inflight_scrapes.submit(
+                key,
+                lambda site_info=site_info: _scrape_and_cache(site_info, product_name, region, request_id),
+            )
+        future_to_site[future] = site_info
+
+    remaining = None if deadline is None else max(deadline - (time.monotonic() - started), 0)
+    try:
+        for future in concurrent.futures.as_completed(future_to_site, timeout=remaining):
+            site_info = future_to_site.pop(future)
+            try:
+                # Get the result from the completed future
+                result, cache_status = future.result()
+            except CircuitOpen:
+                yield SiteResult(site_info.name, [], time.monotonic() - started, "circuit_open")
+                continue
+            except Exception as exc:
+                logger.error("%s generated an exception: %s", site_info.scrape.__name__, exc, extra={"site": site_info.name})
+                yield SiteResult(site_info.name, [], time.monotonic() - started, "error")
+                continue
+            status = {"hit": "cached", "stale": "stale"}.get(cache_status, "ok")
+            yield SiteResult(site_info.name, result or [], time.monotonic() - started, status)
+    except concurrent.futures.TimeoutError:
+        # Still queued or running: they return their browser to the pool when done and fill the cache
+        for site_info in future_to_site.values():
+            yield SiteResult(site_info.name, [], time.monotonic() - started, "timeout")
+
+
+@app.before_request
+def _start_request():
+    # Honour an id set by a proxy in front of us so log lines can be joined across services
+    g.request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    request_id_var.set(g.request_id)
+
+
+@app.after_request
+def _tag_response(response):
+    response.headers["X-Request-ID"] = g.get("request_id", "-")
+    return response
+
+
+def _split_sites(name):
+    value = request.args.get(name, '')
+    return [site.strip().lower() for site in value.split(',') if site.strip()]
+
+
+def _select_sites(location):
+    """Resolve location, sites= and exclude_sites= to the sites to scrape. Raises ValueError for bad input."""
+    return select_sites(location, include=_split_sites('sites'), exclude=_split_sites('exclude_sites'))
+
+
+def _parse_deadline():
+    """Read deadline_ms from the query string. Returns seconds, or raises ValueError."""
+    deadline_ms = int(request.args.get('deadline_ms', DEFAULT_DEADLINE_MS))
+    if deadline_ms <= 0:
+        raise ValueError
+    return deadline_ms / 1000
+
+
+def _parse_page():
+    """Read limit, offset or cursor, min_price, max_price and currency. Raises ValueError with a message."""
+    page = PageRequest()
+    try:
+        if request.args.get('limit'):
+            page.limit = int(request.args['limit'])
+        if request.args.get('cursor'):
+            page.offset = decode_cursor(request.args['cursor'])
+        elif request.args.get('offset'):
+            page.offset = int(request.args['offset'])
+        if request.args.get('min_price'):
+            page.min_price = float(request.args['min_price'])
+        if request.args.get('max_price'):
+            page.max_price = float(request.args['max_price'])
+    except ValueError:
+        raise ValueError("'limit' and 'offset' must be integers, 'min_price' and 'max_price' numbers and 'cursor' "
+                         "a value from X-Next-Cursor.")
+    if (page.limit is not None and page.limit <= 0) or page.offset < 0:
+        raise ValueError("'limit' must be positive and 'offset' not negative.")
+    page.currencies = parse_currencies(request.args.get('currency', ''))
+    return page
 
 
 @app.route('/search', methods=['GET'])
 def search_products():
     """
-    API endpoint to scrape products from all available websites.
+    API endpoint to scrape products from the websites serving a location.
     Query Parameters:
         - product_name (str): The name of the product to search for.
-        - location (str, optional): The country for the search (e.g., 'us', 'india'). Currently ignored.
+        - location (str, optional): The country for the search (e.g., 'us', 'india'). Only sites shipping there are
+          scraped; without it every enabled site is.
+        - sites (str, optional): Comma separated site names to limit the search to.
+        - exclude_sites (str, optional): Comma separated site names to skip.
+        - deadline_ms (int, optional): Time budget in milliseconds (default SEARCH_DEADLINE_MS).
+        - min_price, max_price (float, optional): Price bounds, in the normalized currency.
+        - currency (str, optional): Comma separated currencies to keep, as codes (INR, USD) or symbols.
+        - limit (int, optional): Products per page (default all).
+        - offset (int, optional) or cursor (str, optional): Where the page starts; cursor is the
+          X-Next-Cursor value of the previous page.
+        - group (str, optional): 1 to return one entry per product, grouping near-duplicate titles
+          across sites; limit and offset then count groups.
     Returns:
-        A single JSON list of all found products, sorted by price.
+        A single JSON list of the found products on the requested page, sorted by price_normalized
+        (each price converted with the FX table into the currency named in X-Price-Currency; without
+        rates the header is left out and products sort by currency, then by their own price). With
+        group=1, a list of groups (title, best_price, best_site, sites and the offers, cheapest first),
+        ordered by best price. X-Next-Cursor
+        is set when there is another page. The X-Sites-Searched header lists
+        the sites that were dispatched. Sites that missed the deadline
+        are listed in the X-Timed-Out-Sites header and the list only holds what finished in time.
+        Sites skipped by their circuit breaker are listed in X-Circuit-Open-Sites, and sites whose
+        scrape failed (or got no browser) in X-Failed-Sites.
+        503 with Retry-After when the scrape queue is full.
     """
     product_name = request.args.get('product_name')
-    # Location is accepted but not used in the logic for now, as requested.
     location = request.args.get('location') 
+    group = request.args.get('group', '0').lower() in ('1', 'true')
 
     # --- Input Validation ---
     if not product_name:
         return jsonify({"error": "'product_name' query parameter is required."}), 400
+    try:
+        sites = _select_sites(location)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        deadline = _parse_deadline()
+    except ValueError:
+        return jsonify({"error": "'deadline_ms' must be a positive integer."}), 400
+    try:
+        page = _parse_page()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        scheduler.admit()
+    except Overloaded as e:
+        response = jsonify({"error": f"Server is busy, try again shortly ({e})."})
+        response.headers["Retry-After"] = "5"
+        return response, 503
 
-    all_products = []
+    site_lists = {}  # site -> its products, merged in a fixed site order so pages stay stable
+    timed_out = []
+    circuit_open = []
+    failed = []
     # --- Concurrent Scraping Logic ---
-    # Use a ThreadPoolExecutor to run all scrapers in parallel for better performance.
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        # Create a future for each scraper function
-        future_to_scraper = {executor.submit(run_scraper, scraper, product_name): scraper for scraper in ALL_SCRAPERS}
-        for future in concurrent.futures.as_completed(future_to_scraper):
-            try:
-                # Get the result from the completed future
-                result = future.result()
-                if result:
-                    all_products.extend(result)
-            except Exception as exc:
-                scraper_name = future_to_scraper[future].__name__
-                print(f'{scraper_name} generated an exception: {exc}')
+    with SEARCH_SECONDS.time(endpoint="search"):
+        for result in iter_scraper_results(product_name, sites, deadline, location):
+            site_lists[result.site] = result.products
+            if result.status == "timeout":
+                timed_out.append(result.site)
+            elif result.status == "circuit_open":
+                circuit_open.append(result.site)
+            elif result.status == "error":
+                failed.append(result.site)
+
+    # --- Merging and Formatting ---
+    # Each site's list is already sorted by price, and converting one currency keeps that order,
+    # so normalize, merge and only build the requested page
+    for products in site_lists.values():
+        fx_table.normalize(products)
+    ordered_lists = [site_lists[name] for name in sorted(site_lists)]
+    if group:
+        # Filter first, then group everything, then page the groups, so a page holds whole groups
+        products, _ = paginate(ordered_lists, replace(page, limit=None, offset=0), key=normalized_price, price=filter_price)
+        with GROUPING_SECONDS.time():
+            groups = group_products(products)
+        end = None if page.limit is None else page.offset + page.limit
+        body = encode_groups(groups[page.offset:end])
+        next_offset = end if end is not None and end < len(groups) else None
+    else:
+        products, next_offset = paginate(ordered_lists, page, key=normalized_price, price=filter_price)
+        # Serialize the page straight to JSON, without an intermediate deep copy per product
+        body = encode_products(products)
+
+    response = Response(body, mimetype="application/json")
+    if next_offset is not None:
+        response.headers["X-Next-Cursor"] = encode_cursor(next_offset)
+    if fx_table.currency is not None:
+        response.headers["X-Price-Currency"] = fx_table.currency
+    response.headers["X-Sites-Searched"] = ",".join(site_info.name for site_info in sites)
+    if timed_out:
+        response.headers["X-Timed-Out-Sites"] = ",".join(timed_out)
+    if circuit_open:
+        response.headers["X-Circuit-Open-Sites"] = ",".join(circuit_open)
+    if failed:
+        response.headers["X-Failed-Sites"] = ",".join(failed)
+    return response
+
+
+@app.route('/search/stream', methods=['GET'])
+def search_products_stream():
+    """
+    Streaming variant of /search that sends each site's results as soon as its scraper finishes.
+    Query Parameters:
+        - product_name (str): The name of the product to search for.
+        - location, sites, exclude_sites, deadline_ms, min_price, max_price, currency, limit, offset,
+          cursor (optional): Same as /search; the filters and page apply to the summary's products.
+        - format (str, optional): 'ndjson' (default) or 'sse' for Server-Sent Events.
+    Returns:
+        One {"type": "batch", "site", "status", "elapsed_ms", "products"} message per finished site, then a
+        final {"type": "summary", "elapsed_ms", "count", "timed_out", "circuit_open", "failed", "next_cursor",
+        "currency", "products"} message with the requested page of products sorted by their price in currency. Sites skipped by their circuit breaker get a batch with
+        status "circuit_open" and no products, sites whose scrape failed one with status "error".
+    """
+    product_name = request.args.get('product_name')
+    location = request.args.get('location')
+    stream_format = request.args.get('format', 'ndjson')
+
+    # --- Input Validation ---
+    if not product_name:
+        return jsonify({"error": "'product_name' query parameter is required."}), 400
+    if stream_format not in ('ndjson', 'sse'):
+        return jsonify({"error": "'format' must be 'ndjson' or 'sse'."}), 400
+    try:
+        sites = _select_sites(location)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        deadline = _parse_deadline()
+    except ValueError:
+        return jsonify({"error": "'deadline_ms' must be a positive integer."}), 400
+    try:
+        page = _parse_page()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        scheduler.admit()
+    except Overloaded as e:
+        response = jsonify({"error": f"Server is busy, try again shortly ({e})."})
+        response.headers["Retry-After"] = "5"
+        return response, 503
+
+    def encode(message):
+        payload = json.dumps(message, ensure_ascii=False)
+        if stream_format == 'sse':
+            return f"event: {message['type']}\ndata: {payload}\n\n"
+        return payload + "\n"
+
+    request_id = request_id_var.get()
+
+    def generate():
+        # The generator outlives the view function, so restore the id for its log lines
+        request_id_var.set(request_id)
+        started = time.monotonic()
+        site_lists = {}
+        timed_out = []
+        circuit_open = []
+        failed = []
+        elapsed = 0.0
+        for result in iter_scraper_results(product_name, sites, deadline, location):
+            elapsed = result.elapsed
+            if result.status == "timeout":
+                timed_out.append(result.site)
+                continue
+            if result.status == "circuit_open":
+                circuit_open.append(result.site)
+            elif result.status == "error":
+                failed.append(result.site)
+            fx_table.normalize(result.products)
+            site_lists[result.site] = result.products
+            yield encode({
+                "type": "batch",
+                "site": result.site,
+                "status": result.status,
+                "elapsed_ms": round(result.elapsed * 1000),
+                "products": [p.to_dict() for p in result.products],
+            })
+        products, next_offset = paginate([site_lists[name] for name in sorted(site_lists)], page, key=normalized_price, price=filter_price)
+        yield encode({
+            "type": "summary",
+            "elapsed_ms": round(elapsed * 1000),
+            "count": len(products),
+            "timed_out": timed_out,
+            "circuit_open": circuit_open,
+            "failed": failed,
+            "next_cursor": encode_cursor(next_offset) if next_offset is not None else None,
+            "currency": fx_table.currency,
+            "products": [p.to_dict() for p in products],
+        })
+        SEARCH_SECONDS.observe(time.monotonic() - started, endpoint="search_stream")
+
+    mimetype = 'text/event-stream' if stream_format == 'sse' else 'application/x-ndjson'
+    # X-Accel-Buffering stops reverse proxies from holding batches back until the end
+    return Response(stream_with_context(generate()), mimetype=mimetype, headers={"X-Accel-Buffering": "no"})
+
+
+def _history_args():
+    """Read product_name, site, days and limit for the history endpoints. Raises ValueError with a message."""
+    product_name = request.args.get('product_name')
+    if not product_name:
+        raise ValueError("'product_name' query parameter is required.")
+    try:
+        days = float(request.args['days']) if request.args.get('days') else None
+        limit = int(request.args.get('limit', 100))
+    except ValueError:
+        raise ValueError("'days' must be a number and 'limit' an integer.")
+    if limit <= 0 or (days is not None and days <= 0):
+        raise ValueError("'days' and 'limit' must be positive.")
+    since = time.time() - days * 86400 if days is not None else None
+    return normalize_query(product_name), request.args.get('site'), since, limit
 
-    # --- Sorting and Formatting ---
-    # Sort the combined list of all products by price in ascending order
-    all_products.sort(key=lambda p: p.price_whole)
 
-    # Convert the list of Product objects to a list of dictionaries for the JSON response
-    products_dict = [asdict(p) for p in all_products]
-    
-    return jsonify(products_dict)
+@app.route('/history', methods=['GET'])
+def price_history_endpoint():
+    """
+    API endpoint listing recorded prices from the local store; never scrapes.
+    Query Parameters:
+        - product_name (str): The query the products were scraped for (normalized like the cache key).
+        - site (str, optional): Only this site.
+        - link (str, optional): Only this product.
+        - days (float, optional): Only the last N days.
+        - limit (int, optional): Rows at most (default 100).
+    Returns:
+        JSON list of observations (scraped_at, site, title, link, price, currency, normalized price), newest first.
+    """
+    if price_history is None:
+        return jsonify({"error": "Price history is disabled (PRICE_HISTORY=0)."}), 404
+    try:
+        query, site, since, limit = _history_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(price_history.history(query, site=site, link=request.args.get('link'), since=since, limit=limit))
+
+
+@app.route('/history/lowest', methods=['GET'])
+def lowest_price_endpoint():
+    """
+    API endpoint for the cheapest price seen per product, from the local store; never scrapes.
+    Query Parameters:
+        - product_name (str): The query the products were scraped for.
+        - site (str, optional): Only this site.
+        - days (float, optional): Only the last N days, e.g. 7 for "cheapest this week".
+        - limit (int, optional): Products at most (default 100).
+    Returns:
+        JSON list of products with their lowest normalized price, when it was seen and how many
+        observations there are, cheapest first.
+    """
+    if price_history is None:
+        return jsonify({"error": "Price history is disabled (PRICE_HISTORY=0)."}), 404
+    try:
+        query, site, since, limit = _history_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(price_history.lowest(query, site=site, since=since, limit=limit))
+
+
+@app.route('/sites', methods=['GET'])
+def list_sites():
+    """
+    API endpoint describing the registered sites.
+    Returns:
+        JSON list of each site's name, regions, currency, expected cost and whether it is enabled.
+    """
+    return jsonify([
+        {
+            "name": info.name,
+            "regions": list(info.regions),
+            "currency": info.currency,
+            "expected_cost": info.expected_cost,
+            "http_fetch": info.fetch is not None,
+            "enabled": info.enabled,
+        }
+        for info in SITES.values()
+    ])
+
+
+@app.route('/stats', methods=['GET'])
+def stats():
+    """
+    API endpoint exposing runtime counters.
+    Returns:
+        JSON with the browser pool occupancy, launch counts and lease wait times,
+        per-site time-to-ready percentiles, how often each site was served over HTTP,
+        result cache counters, how many scrapes were saved by joining one in flight,
+        the scheduler's queue depth and wait times, each site's circuit breaker state, the FX rates in use
+        and the price history writer's counters.
+    """
+    return jsonify({
+        "browser_pool": browser_pool.stats(),
+        "readiness": readiness_stats(),
+        "served_by": fetch_stats(),
+        "cache": result_cache.stats(),
+        "coalescing": inflight_scrapes.stats(),
+        "scheduler": scheduler.stats(),
+        "circuit_breakers": circuit_breakers.stats(),
+        "fx": fx_table.stats(),
+        "price_history": price_history.stats() if price_history is not None else None,
+    })
+
+# --- Metrics ---
+# The /stats counters, also exposed as Prometheus gauges
+metrics.register(StatsGauges("browser_pool", browser_pool.stats, "Browser pool state, see /stats."))
+metrics.register(StatsGauges("scheduler", scheduler.stats, "Scrape scheduler state, see /stats."))
+metrics.register(StatsGauges("cache", result_cache.stats, "Result cache counters, see /stats."))
+metrics.register(StatsGauges("coalescing", inflight_scrapes.stats, "In-flight scrape coalescing, see /stats."))
+metrics.register(StatsGauges("circuit", circuit_breakers.stats, "Per-site circuit breakers (state: 0 closed, 1 half open, 2 open)."))
+metrics.register(StatsGauges("fx", fx_table.stats, "FX rates used to normalize prices, see /stats."))
+if price_history is not None:
+    metrics.register(StatsGauges("price_history", price_history.stats, "Price history writer, see /stats."))
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """
+    API endpoint for Prometheus.
+    Returns:
+        Per-site, per-phase timing histograms (navigate, wait, discover, extract, parse, http_fetch, total),
+        per-field timings, parse failures by selector, scrape outcomes, browser launch and lease wait
+        times, search latency, and the /stats counters as gauges, in the text exposition format.
+    """
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Price comparison API, or a batch run over a JSONL file of queries.")
+    parser.add_argument("--batch", metavar="QUERIES_JSONL", help="Run these queries instead of serving HTTP")
+    parser.add_argument("--output", default="results.jsonl", help="Batch output JSONL, also the resume checkpoint")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("BATCH_WORKERS", "2")),
+                        help="Batch worker processes, each with its own browser")
+    parser.add_argument("--chunk-size", type=int, default=10, help="Queries per site handed to a worker at once")
+    args = parser.parse_args()
+
+    if args.batch:
+        from batch import run_batch
+        summary = run_batch(args.batch, args.output, workers=args.workers, chunk_size=args.chunk_size)
+        logger.info("Batch finished: %s", summary)
+        return
+
+    # Pre-start the browsers so the first /search does not pay for cold launches
+    browser_pool.start()
+    try:
+        # For production, use a proper WSGI server like Gunicorn or uWSGI
+        # The reloader is off because it would start a second process with its own browser pool
+        app.run(debug=True, port=5001, use_reloader=False)
+    finally:
+        browser_pool.close()
+        if price_history is not None:
+            price_history.close()
 
 if __name__ == '__main__':
-    # For production, use a proper WSGI server like Gunicorn or uWSGI
-    app.run(debug=True, port=5001)
+    main()
@@ -0,0 +1,53 @@
+import threading
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls for the same key: the first caller submits the work, later callers
+    get the same Future until it completes.
+
+    Every caller waits on the shared Future with its own timeout. Callers must never cancel it,
+    since other requests may still be waiting on the result.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._started = 0
+        self._joined = 0
+
+    def submit(self, key, start):
+        """
+        Call start() to launch the work unless a call for key is already in flight.
+
+        Args:
+            key (hashable): Identifies identical work, e.g. (site, normalized query, location).
+            start (callable): Zero-argument function that submits the work and returns its Future.
+
+        Returns:
+            tuple[Future, bool]: The shared Future and whether this caller joined an existing call.
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self._joined += 1
+                return future, True
+            future = start()
+            self._inflight[key] = future
+            self._started += 1
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future, False
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def stats(self) -> dict:
+        """Return how many calls ran, how many were saved by joining one in flight, and how many are running."""
+        with self._lock:
+            return {
+                "started": self._started,
+                "scrapes_saved": self._joined,
+                "in_flight": len(self._inflight),
+            }
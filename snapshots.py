@@ -0,0 +1,139 @@
+import argparse
+import concurrent.futures
+import gzip
+import hashlib
+import importlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotStore:
+    """
+    Content-addressed store of raw result pages, so extraction can be re-run without re-fetching.
+
+    Each page is gzip-compressed and stored once under objects/<sha256[:2]>/<sha256>.html.gz,
+    however many times it is captured. index.jsonl gets one line per capture with the site, query,
+    URL, digest and time, which is what re-parsing iterates over.
+
+    Args:
+        root (str): Directory holding objects/ and index.jsonl.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._index_path = os.path.join(root, "index.jsonl")
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+
+    def _object_path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.html.gz")
+
+    def put(self, site, query, url, html) -> str:
+        """Store a page (if not already stored) and index the capture. Returns its sha256 digest."""
+        raw = html.encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename, so a reader never sees half a file
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(raw, compresslevel=6))
+            os.replace(tmp, path)
+        entry = {"site": site, "query": query, "url": url, "sha256": digest, "captured_at": time.time(), "bytes": len(raw)}
+        with self._lock, open(self._index_path, "a", encoding="utf-8") as index:
+            index.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return digest
+
+    def get(self, digest) -> str:
+        """Return a stored page's HTML."""
+        with open(self._object_path(digest), "rb") as f:
+            return gzip.decompress(f.read()).decode("utf-8")
+
+    def entries(self, site=None):
+        """Yield the index entries, oldest first, optionally for one site only."""
+        if not os.path.exists(self._index_path):
+            return
+        with open(self._index_path, encoding="utf-8") as index:
+            for line in index:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if site is None or entry["site"] == site:
+                    yield entry
+
+
+# --- Capture ---
+# Set SCRAPER_SNAPSHOTS=1 to keep every scraped page under SNAPSHOT_DIR
+snapshot_store = SnapshotStore(os.environ.get("SNAPSHOT_DIR", "snapshots")) if os.environ.get("SCRAPER_SNAPSHOTS", "0") != "0" else None
+
+
+def capture_html(site, query, url, html):
+    """Store a fetched page when capture is on. Never raises: a full disk must not fail the scrape."""
+    if snapshot_store is None:
+        return
+    try:
+        snapshot_store.put(site, query, url, html)
+    except Exception as e:
+        logger.warning("Could not store a %s snapshot: %s", site, e)
+
+
+def capture_page(browser, site, query):
+    """Store the page currently loaded in browser when capture is on (costs one page_source round trip)."""
+    if snapshot_store is None:
+        return
+    try:
+        html, url = browser.page_source, browser.current_url
+    except Exception as e:
+        logger.warning("Could not read the %s page for a snapshot: %s", site, e)
+        return
+    capture_html(site, query, url, html)
+
+
+# --- Re-parsing ---
+def reparse(store_root, entry):
+    """Run the site's HTML extraction on one snapshot. Returns the result record for the output file."""
+    module = importlib.import_module(entry["site"])
+    html = SnapshotStore(store_root).get(entry["sha256"])
+    products = module.parse_html(html, entry["url"])
+    products.sort(key=lambda p: p.price_whole)
+    return {**entry, "count": len(products), "products": [product.to_dict() for product in products]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-run extraction over stored page snapshots, on CPU only.")
+    parser.add_argument("--dir", default=os.environ.get("SNAPSHOT_DIR", "snapshots"), help="Snapshot store directory")
+    parser.add_argument("--site", help="Only this site's snapshots")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Parser processes")
+    parser.add_argument("--output", default="reparsed.jsonl", help="JSONL file of products per snapshot")
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.dir)
+    summary = {}
+    with open(args.output, "w", encoding="utf-8") as output, \
+            concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = [executor.submit(reparse, args.dir, entry) for entry in store.entries(args.site)]
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                record = future.result()
+            except Exception as e:
+                logger.warning("Could not re-parse a snapshot: %s", e)
+                continue
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            site = summary.setdefault(record["site"], {"snapshots": 0, "empty": 0, "products": 0})
+            site["snapshots"] += 1
+            site["products"] += record["count"]
+            # An empty result from a page that had products is the sign of a broken selector
+            site["empty"] += record["count"] == 0
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import WebDriverException
+
+from browser_pool import driver_rss_bytes
+from metrics import BROWSER_LAUNCH_SECONDS, LEASE_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class TabBrowser:
+    """
+    Stands in for a WebDriver inside one tab of a shared Chrome.
+
+    WebDriver commands act on whichever window is current, so every call takes the host's lock
+    and switches to this tab first. The lock is only held for the command itself: while one
+    scraper sleeps between readiness polls, the others drive their own tabs.
+    WebElements returned by find_elements are not bound to the tab, so scrapers using tabs must
+    extract with one script (SCRAPER_EXTRACTION=bulk) rather than element by element.
+    """
+
+    def __init__(self, driver, handle, lock):
+        self._driver = driver
+        self._handle = handle
+        self._lock = lock
+
+    def __getattr__(self, name):
+        driver, handle, lock = self._driver, self._handle, self._lock
+        if callable(getattr(type(driver), name, None)):
+            method = getattr(driver, name)
+
+            def in_tab(*args, **kwargs):
+                with lock:
+                    driver.switch_to.window(handle)
+                    return method(*args, **kwargs)
+            return in_tab
+        # Properties such as page_source and current_url also read the current window
+        with lock:
+            driver.switch_to.window(handle)
+            return getattr(driver, name)
+
+
+class TabPool:
+    """
+    Runs every scrape as a tab of a single Chrome instead of a browser per scraper.
+
+    One Chrome (started with page load strategy "none", so navigations return at once and the
+    scrapers' readiness polls do the waiting) hosts up to size tabs. A lease opens a fresh tab and
+    closes it afterwards; the first window stays open on about:blank so the session survives. The
+    browser is replaced once it has served max_pages pages with no tab open, or when it crashed.
+    Interchangeable with BrowserPool for scrape.py's run_scraper.
+
+    Args:
+        factory (callable): Zero-argument function returning a new WebDriver.
+        size (int): Maximum number of tabs open at the same time.
+        max_pages (int): Pages the browser may serve before it is replaced.
+        lease_timeout (float): Seconds lease() waits for a free tab before raising TimeoutError.
+    """
+
+    def __init__(self, factory, size=5, max_pages=200, lease_timeout=60.0):
+        self._factory = factory
+        self.size = size
+        self.max_pages = max_pages
+        self.lease_timeout = lease_timeout
+
+        self._driver = None
+        self._driver_lock = threading.RLock()  # Serializes WebDriver commands across tabs
+        self._open_tabs = 0
+        self._pages = 0
+        self._broken = False
+        self._closed = False
+        self._launching = False  # Browser being (re)launched outside the lock; no tabs open meanwhile
+        self._cond = threading.Condition()
+
+        self._launches = 0
+        self._launch_failures = 0
+        self._recycled = 0
+        self._crashed = 0
+        self._leases = 0
+        self._lease_wait_total = 0.0
+        self._lease_wait_max = 0.0
+
+    # --- Lifecycle ---
+    def start(self):
+        """Launch the host browser so the first request finds it warm."""
+        with self._cond:
+            if self._driver is not None or self._closed or self._launching:
+                return
+            self._launching = True
+        driver = self._launch()
+        with self._cond:
+            self._launching = False
+            if driver is not None and not self._closed:
+                self._driver, driver = driver, None
+            self._cond.notify_all()
+        if driver is not None:
+            # Closed while launching
+            self._quit(driver)
+
+    def close(self):
+        """Quit the host browser and refuse further leases."""
+        with self._cond:
+            self._closed = True
+            driver, self._driver = self._driver, None
+            self._cond.notify_all()
+        if driver is not None:
+            self._quit(driver)
+
+    # --- Leasing ---
+    @contextmanager
+    def lease(self):
+        """
+        Borrow a tab for the duration of a with-block.
+
+        Yields:
+            TabBrowser: A new tab, usable like a WebDriver.
+
+        Raises:
+            TimeoutError: If no tab became free within lease_timeout seconds.
+        """
+        driver, handle = self._acquire()
+        try:
+            yield TabBrowser(driver, handle, self._driver_lock)
+        finally:
+            self._release(driver, handle)
+
+    def _acquire(self):
+        started = time.monotonic()
+        deadline = started + self.lease_timeout
+        stale = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Tab pool is closed")
+                if self._open_tabs < self.size and not self._launching:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No tab available after {self.lease_timeout}s")
+                self._cond.wait(remaining)
+            if self._open_tabs == 0 and self._driver is not None and (self._broken or self._pages >= self.max_pages):
+                # Nothing is using the browser, so this is the moment to swap it
+                if self._broken:
+                    self._crashed += 1
+                else:
+                    self._recycled += 1
+                stale, self._driver = self._driver, None
+            launch = self._driver is None
+            self._launching = launch
+            self._open_tabs += 1
+            driver = self._driver
+
+        if launch:
+            # Quit and launch with the lock released, so stats() and other leases are not held up;
+            # leases arriving meanwhile wait on _launching
+            if stale is not None:
+                self._quit(stale)
+            driver = self._launch()
+            with self._cond:
+                self._launching = False
+                closed = self._closed
+                if driver is not None and not closed:
+                    self._driver = driver
+                    self._broken = False
+                    self._pages = 0
+                else:
+                    self._open_tabs -= 1
+                self._cond.notify_all()
+            if driver is None:
+                raise RuntimeError("Could not launch the browser for the tab pool")
+            if closed:
+                self._quit(driver)
+                raise RuntimeError("Tab pool is closed")
+
+        try:
+            with self._driver_lock:
+                driver.switch_to.new_window("tab")
+                handle = driver.current_window_handle
+        except Exception:
+            self._tab_done(broken=True)
+            raise
+
+        waited = time.monotonic() - started
+        LEASE_WAIT_SECONDS.observe(waited)
+        with self._cond:
+            self._leases += 1
+            self._lease_wait_total += waited
+            self._lease_wait_max = max(self._lease_wait_max, waited)
+        return driver, handle
+
+    def _release(self, driver, handle):
+        broken = False
+        try:
+            with self._driver_lock:
+                driver.switch_to.window(handle)
+                driver.close()
+                driver.switch_to.window(driver.window_handles[0])
+        except WebDriverException as e:
+            logger.warning("Tab pool could not close a tab, replacing the browser: %s", e)
+            broken = True
+        self._tab_done(broken)
+
+    def _tab_done(self, broken):
+        with self._cond:
+            self._open_tabs -= 1
+            self._pages += 1
+            self._broken = self._broken or broken
+            self._cond.notify()
+
+    # --- Browser management ---
+    def _launch(self):
+        started = time.perf_counter()
+        try:
+            driver = self._factory()
+        except Exception as e:
+            logger.error("Tab pool failed to launch the browser: %s", e)
+            with self._cond:
+                self._launch_failures += 1
+            return None
+        BROWSER_LAUNCH_SECONDS.observe(time.perf_counter() - started)
+        with self._cond:
+            self._launches += 1
+        return driver
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning("Tab pool could not quit the browser cleanly: %s", e)
+
+    # --- Introspection ---
+    def memory_mb(self):
+        """RSS of the host browser's process tree in MB, or None without psutil."""
+        driver = self._driver
+        rss = driver_rss_bytes(driver) if driver is not None else 0
+        return None if rss is None else round(rss / (1024 * 1024), 1)
+
+    def stats(self) -> dict:
+        """Return open tabs, launch counts and lease wait times, in the same shape as BrowserPool.stats()."""
+        with self._cond:
+            return {
+                "mode": "tabs",
+                "size": self.size,
+                "live": 1 if self._driver is not None else 0,
+                "in_use": self._open_tabs,
+                "pages": self._pages,
+                "launches": self._launches,
+                "launch_failures": self._launch_failures,
+                "recycled": self._recycled,
+                "crashed": self._crashed,
+                "leases": self._leases,
+                "lease_wait_total_s": round(self._lease_wait_total, 4),
+                "lease_wait_avg_s": round(self._lease_wait_total / self._leases, 4) if self._leases else 0.0,
+                "lease_wait_max_s": round(self._lease_wait_max, 4),
+            }
@@ -1,20 +1,35 @@
+import logging
+import os
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from dataclasses import dataclass
 from urllib.parse import urljoin
+from product import Product
+from registry import SiteInfo, register
+from readiness import ReadinessSpec, wait_until_ready
+from extraction import EXTRACTION_MODE, FieldSpec, extract_rows, extract_rows_from_html
+from metrics import PHASE_SECONDS, field_timer
+from snapshots import capture_page
 
-@dataclass
-class Product:
-    """A class to hold product information."""
-    title: str
-    price_currency: str
-    price_whole: float
-    link: str
+logger = logging.getLogger(__name__)
 
-    def __str__(self):
-        return f"{self.title} - {self.price_currency}{self.price_whole} - {self.link}"
+# Overridable so benchmarks can point the scraper at a local fixture server
+BASE_URL = os.environ.get("TARGET_BASE_URL", "https://www.target.com")
+CONTAINER_SELECTOR = "div.sc-3f9295af-7.bnHeCs"
+
+# Target lazy-loads result cards in batches; wait for the count to stop growing
+READINESS = ReadinessSpec(site="target", container_selector=CONTAINER_SELECTOR, timeout=20, stable_polls=3)
+
+# Field selectors for the single round trip extraction path
+FIELDS = {
+    "title": FieldSpec("a[data-test='product-title']"),
+    "price": FieldSpec("span[data-test='current-price']"),
+    "link": FieldSpec("a[data-test='product-title']", attr="href"),
+}
+
+def search_url(product_name: str) -> str:
+    """Build the Target search results URL for product_name."""
+    query = product_name.replace(" ", "+")
+    return f"{BASE_URL}/s?searchTerm={query}"
 
 def scrape_target_products(product_name: str, browser: webdriver) -> list[Product]:
     """
@@ -29,49 +44,114 @@ def scrape_target_products(product_name: str, browser: webdriver) -> list[Produc
     """
     try:
         # Navigate to Target's search page
-        base_url = "https://www.target.com"
-        query = product_name.replace(" ", "+")
-        browser.get(f"{base_url}/s?searchTerm={query}")
+        with PHASE_SECONDS.time(site="target", phase="navigate"):
+            browser.get(search_url(product_name))
 
         # Wait for the product containers to be present
-        wait = WebDriverWait(browser, 20)
-        product_containers = wait.until(
-            EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div.sc-3f9295af-7.bnHeCs"))
-        )
-
-        products = []
-        for container in product_containers:
-            try:
-                # Extract the product title
+        wait_until_ready(browser, READINESS)
+        capture_page(browser, "target", product_name)
+        products = extract_products(browser)
+
+        # Sort products by price
+        products.sort(key=lambda p: p.price_whole)
+        return products
+
+    except Exception as e:
+        logger.error("An error occurred while scraping Target: %s", e)
+        return []
+
+def extract_products(browser: webdriver, mode: str = None) -> list[Product]:
+    """
+    Extract products from the results page currently loaded in browser.
+
+    Args:
+        browser (webdriver): Selenium WebDriver instance on a Target results page.
+        mode (str, optional): "bulk" or "elements". Defaults to EXTRACTION_MODE.
+
+    Returns:
+        list[Product]: The valid products in page order.
+    """
+    if (mode or EXTRACTION_MODE) == "elements":
+        return _extract_with_elements(browser)
+    return _extract_with_script(browser)
+
+def parse_html(html: str, base_url: str = BASE_URL) -> list[Product]:
+    """
+    Extract products from the HTML of a rendered Target results page, e.g. a stored snapshot.
+
+    Returns:
+        list[Product]: The valid products in page order.
+    """
+    return _parse_rows(extract_rows_from_html(html, CONTAINER_SELECTOR, FIELDS, base_url=base_url, site="target"))
+
+def _extract_with_script(browser: webdriver) -> list[Product]:
+    return _parse_rows(extract_rows(browser, CONTAINER_SELECTOR, FIELDS, site="target"))
+
+def _parse_rows(rows: list[dict]) -> list[Product]:
+    products = []
+    for row in rows:
+        if not (row["title"] and row["price"]):
+            continue
+        title = row["title"].strip()
+        try:
+            price_whole = float(row["price"].replace("$", "").strip())
+        except ValueError as e:
+            logger.debug("Could not parse a product row: %s", e)
+            continue
+        if title and price_whole > 0:
+            products.append(Product(
+                title=title,
+                price_currency="$",
+                price_whole=price_whole,
+                link=urljoin(BASE_URL, row["link"] or ""),
+                site="target"
+            ))
+    return products
+
+def _extract_with_elements(browser: webdriver) -> list[Product]:
+    with PHASE_SECONDS.time(site="target", phase="discover"):
+        product_containers = browser.find_elements(By.CSS_SELECTOR, CONTAINER_SELECTOR)
+
+    products = []
+    for container in product_containers:
+        try:
+            # Extract the product title
+            with field_timer("target", "title", "a[data-test='product-title']"):
                 title_element = container.find_element(By.CSS_SELECTOR, "a[data-test='product-title']")
                 title = title_element.text.strip()
 
-                # Extract the product price
+            # Extract the product price
+            with field_timer("target", "price", "span[data-test='current-price']"):
                 price_element = container.find_element(By.CSS_SELECTOR, "span[data-test='current-price']")
                 price_text = price_element.text.replace("$", "").strip()
                 price_whole = float(price_text)
-                price_currency = "$"
+            price_currency = "$"
 
-                # Extract the product link and make it absolute
+            # Extract the product link and make it absolute
+            with field_timer("target", "link", "a[data-test='product-title']"):
                 relative_link = title_element.get_attribute("href")
-                link = urljoin(base_url, relative_link)
-
-                # Add valid products to the list
-                if title and price_whole > 0:
-                    products.append(Product(
-                        title=title,
-                        price_currency=price_currency,
-                        price_whole=price_whole,
-                        link=link
-                    ))
-            except Exception as e:
-                print(f"Could not parse a product container: {e}")
-                continue
+            link = urljoin(BASE_URL, relative_link)
 
-        # Sort products by price
-        products.sort(key=lambda p: p.price_whole)
-        return products
+            # Add valid products to the list
+            if title and price_whole > 0:
+                products.append(Product(
+                    title=title,
+                    price_currency=price_currency,
+                    price_whole=price_whole,
+                    link=link,
+                    site="target"
+                ))
+        except Exception as e:
+            logger.debug("Could not parse a product container: %s", e)
+            continue
 
-    except Exception as e:
-        print(f"An error occurred while scraping Target: {e}")
-        return []
+    return products
+
+# No HTTP fetcher: results are rendered client side
+register(SiteInfo(
+    name="target",
+    scrape=scrape_target_products,
+    regions=("us",),
+    currency="$",
+    expected_cost=8.0,
+))